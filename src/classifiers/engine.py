@@ -15,7 +15,8 @@ Scoring algorithm:
     Minimum primary guard:
         If primary_matches < min_primary_matches → confidence = 0.0 (hard disqualification)
 
-The category with the highest confidence above its threshold wins.
+The category with the highest confidence above its threshold wins; ties go
+to the category evaluated first (lowest `priority` in categories.yaml).
 If no category exceeds its threshold → escalation_reason is set and LLM is invoked.
 
 Implemented in Sprint 2.
@@ -23,16 +24,19 @@ Implemented in Sprint 2.
 
 from __future__ import annotations
 
+import hashlib
 import logging
-import re
-from typing import Optional
+import threading
+from collections import OrderedDict
+from typing import Iterable, Iterator, Optional
 
-from src.config.loader import CategoryConfig, KeywordConfigLoader, get_loader
+from src.config.loader import CategoryConfig, KeywordConfigLoader, KeywordIndex, get_loader
 from src.models.schemas import ClassificationResult
 
 logger = logging.getLogger(__name__)
 
 _EXCLUSION_PENALTY = 0.30
+_RESULT_CACHE_SIZE = 4096
 
 
 class KeywordClassifier:
@@ -48,37 +52,112 @@ class KeywordClassifier:
             # escalate to LLM
     """
 
-    def __init__(self, loader: Optional[KeywordConfigLoader] = None) -> None:
+    def __init__(
+        self,
+        loader: Optional[KeywordConfigLoader] = None,
+        cache_size: int = _RESULT_CACHE_SIZE,
+    ) -> None:
         self._loader = loader or get_loader()
+        # LRU of document digest -> result, valid for one category snapshot
+        self._cache_size = cache_size
+        self._result_cache: OrderedDict[bytes, ClassificationResult] = OrderedDict()
+        self._cache_index: KeywordIndex | None = None
+        self._cache_lock = threading.Lock()
 
-    def classify(self, text: str) -> ClassificationResult:
+    def classify(self, text: str, use_cache: bool = True) -> ClassificationResult:
         """
         Score the document text against all enabled keyword dictionaries.
         Returns the best match (highest confidence above threshold), or
         an 'unclassified' result with an escalation reason if no category wins.
+
+        Results are memoised by document digest, so re-submitted documents
+        skip scoring. The cache is dropped whenever the keyword snapshot
+        changes (hot reload or reload_all). Pass use_cache=False to bypass it.
+        """
+        index = self._loader.get_keyword_index()
+        if use_cache and self._cache_size > 0:
+            return self._classify_cached(text, index)
+        return self._classify_one(text, index)
+
+    def classify_batch(
+        self,
+        texts: Iterable[str],
+        use_cache: bool = True,
+    ) -> list[ClassificationResult]:
         """
-        categories = self._loader.get_categories()
+        Classify many documents against one category snapshot.
+
+        The snapshot and its shared keyword automaton are fetched once for
+        the whole batch; each document is then scanned a single time for
+        the keywords of every category.
+        """
+        index = self._loader.get_keyword_index()
+        if use_cache and self._cache_size > 0:
+            return [self._classify_cached(text, index) for text in texts]
+        return [self._classify_one(text, index) for text in texts]
+
+    def clear_cache(self) -> None:
+        """Drop all memoised classify() results (e.g. for test isolation)."""
+        with self._cache_lock:
+            self._result_cache.clear()
+            self._cache_index = None
+
+    def _classify_cached(self, text: str, index: KeywordIndex) -> ClassificationResult:
+        key = hashlib.blake2b(
+            text.encode("utf-8", "surrogatepass"), digest_size=16,
+        ).digest()
+        cache = self._result_cache
+        with self._cache_lock:
+            if index is not self._cache_index:
+                cache.clear()
+                self._cache_index = index
+            result = cache.get(key)
+            if result is not None:
+                cache.move_to_end(key)
+                return _detached(result)
+
+        result = self._classify_one(text, index)
+
+        with self._cache_lock:
+            if index is self._cache_index:
+                cache[key] = result
+                if len(cache) > self._cache_size:
+                    cache.popitem(last=False)
+        return _detached(result)
+
+    def _classify_one(self, text: str, index: KeywordIndex) -> ClassificationResult:
         text_lower = text.lower()
 
         best_slug: str | None = None
+        best_cfg: CategoryConfig | None = None
         best_confidence = 0.0
-        best_matched: list[str] = []
+        best_bits = (0, 0)
         best_threshold = 0.0
 
-        for slug, cfg in categories.items():
-            confidence, matched = self._score_category(text_lower, cfg)
+        for slug, cfg, confidence, primary_bits, secondary_bits in self._score_all(text_lower, index):
             logger.debug(
                 "Category %s: confidence=%.4f threshold=%.2f matched=%d keywords",
-                slug, confidence, cfg.confidence_threshold, len(matched),
+                slug, confidence, cfg.confidence_threshold,
+                primary_bits.bit_count() + secondary_bits.bit_count(),
             )
             if confidence > best_confidence:
                 best_slug = slug
+                best_cfg = cfg
                 best_confidence = confidence
-                best_matched = matched
+                best_bits = (primary_bits, secondary_bits)
                 best_threshold = cfg.confidence_threshold
+                if confidence >= 1.0:
+                    # Confidence is capped at 1.0, so no later category can beat this
+                    break
+
+        # Only the winning category's matched keywords are materialised
+        best_matched = _decode_matched(best_cfg, *best_bits) if best_cfg is not None else []
+
+        # Results are built from values this method controls (confidence is
+        # already in [0, 1]), so Pydantic validation is skipped.
 
         if best_slug is not None and best_confidence >= best_threshold:
-            return ClassificationResult(
+            return ClassificationResult.model_construct(
                 category=best_slug,
                 confidence=best_confidence,
                 method="deterministic",
@@ -94,7 +173,7 @@ class KeywordClassifier:
         else:
             reason = "No categories available for scoring"
 
-        return ClassificationResult(
+        return ClassificationResult.model_construct(
             category="unclassified",
             confidence=best_confidence,
             method="unclassified",
@@ -102,68 +181,150 @@ class KeywordClassifier:
             escalation_reason=reason,
         )
 
+    def _score_all(
+        self,
+        text_lower: str,
+        index: KeywordIndex,
+    ) -> Iterator[tuple[str, CategoryConfig, float, int, int]]:
+        """
+        Yield (slug, cfg, confidence, primary_bits, secondary_bits) for every
+        category in snapshot order, from one pass of the shared automaton.
+        """
+        automaton = index.automaton
+        if automaton is None:
+            # Categories that cannot beat the running best are cut short
+            best = 0.0
+            for slug, cfg in index.categories.items():
+                scored = self._score_hits_scan(text_lower, cfg, floor=best)
+                best = max(best, scored[0])
+                yield (slug, cfg, *scored)
+            return
+
+        all_primary = all_secondary = all_exclusion = 0
+        for _end, (primary, secondary, exclusion) in automaton.iter(text_lower):
+            all_primary |= primary
+            all_secondary |= secondary
+            all_exclusion |= exclusion
+
+        for slug, cfg, ((p_off, p_mask), (s_off, s_mask), (x_off, x_mask)) in index.entries:
+            exclusion_bits = all_exclusion >> x_off & x_mask
+            yield (slug, cfg, *self._weighted_confidence(
+                cfg,
+                all_primary >> p_off & p_mask,
+                all_secondary >> s_off & s_mask,
+                _first_keyword(cfg._exclusion_tuple, exclusion_bits),
+            ))
+
     def extract_fields(self, text: str, category_cfg: CategoryConfig) -> dict[str, str]:
         """
         Run regex patterns for the winning category against the document text.
         Returns {field_name: extracted_value} for all matched patterns.
         """
         extracted: dict[str, str] = {}
-        for field_name, rp in category_cfg.regex_patterns.items():
-            match = re.search(rp.pattern, text, re.IGNORECASE)
+        for field_name, pattern, group in category_cfg._extractors:
+            match = pattern.search(text)
             if match:
                 try:
-                    value = match.group(rp.group).strip()
+                    value = match.group(group).strip()
                 except (IndexError, AttributeError):
                     continue
                 if value:
                     extracted[field_name] = value
         return extracted
 
-    def _score_category(
+    def _score_hits_scan(
         self,
         text_lower: str,
         cfg: CategoryConfig,
-    ) -> tuple[float, list[str]]:
+        floor: float = -1.0,
+    ) -> tuple[float, int, int]:
         """
-        Compute confidence score for one category.
-        Returns (confidence, matched_keywords).
+        Per-keyword substring scan used when pyahocorasick is unavailable.
+
+        If even a full set of secondary matches could not lift the category
+        above `floor` (the best confidence seen so far), the secondary and
+        exclusion scans are skipped and (0.0, 0, 0) is returned.
         """
-        matched: list[str] = []
+        # Bind everything the loops touch to locals once per call
+        primary = cfg._primary_tuple
+        secondary = cfg._secondary_tuple
+        pw = cfg._pw
+        sw = cfg._sw
+        max_score = cfg._max_score
 
-        # Count primary keyword matches
-        primary_count = 0
-        for kw in cfg.primary_keywords:
+        primary_bits = 0
+        bit = 1
+        for kw in primary:
             if kw in text_lower:
-                primary_count += 1
-                matched.append(kw)
+                primary_bits |= bit
+            bit <<= 1
 
-        # Hard guard: minimum primary matches
-        if primary_count < cfg.scoring.min_primary_matches:
-            return 0.0, []
+        # Hard guard: skip the remaining lists when the category is disqualified
+        primary_count = primary_bits.bit_count()
+        if primary_count < cfg._min_primary:
+            return 0.0, 0, 0
+
+        # Upper bound: every secondary keyword matches and no exclusion applies
+        if max_score and (primary_count * pw + len(secondary) * sw) / max_score <= floor:
+            return 0.0, 0, 0
+
+        secondary_bits = 0
+        bit = 1
+        for kw in secondary:
+            if kw in text_lower:
+                secondary_bits |= bit
+            bit <<= 1
 
-        # Count secondary keyword matches
-        secondary_count = 0
-        for kw in cfg.secondary_keywords:
+        excluded_kw = None
+        for kw in cfg._exclusion_tuple:
             if kw in text_lower:
-                secondary_count += 1
-                matched.append(kw)
+                excluded_kw = kw
+                break
 
-        # Weighted score
-        pw = cfg.scoring.primary_weight
-        sw = cfg.scoring.secondary_weight
-        raw_score = (primary_count * pw) + (secondary_count * sw)
-        max_score = (len(cfg.primary_keywords) * pw) + (len(cfg.secondary_keywords) * sw)
+        return self._weighted_confidence(cfg, primary_bits, secondary_bits, excluded_kw)
 
+    @staticmethod
+    def _weighted_confidence(
+        cfg: CategoryConfig,
+        primary_bits: int,
+        secondary_bits: int,
+        excluded_kw: str | None,
+    ) -> tuple[float, int, int]:
+        """Apply the primary guard, weighted ratio and exclusion penalty to hit masks."""
+        primary_count = primary_bits.bit_count()
+
+        # Hard guard: minimum primary matches
+        if primary_count < cfg._min_primary:
+            return 0.0, 0, 0
+
+        max_score = cfg._max_score
         if max_score == 0:
-            return 0.0, matched
+            return 0.0, primary_bits, secondary_bits
 
-        confidence = raw_score / max_score
+        confidence = (primary_count * cfg._pw + secondary_bits.bit_count() * cfg._sw) / max_score
 
         # Exclusion penalty
-        for kw in cfg.exclusion_keywords:
-            if kw in text_lower:
-                logger.debug("Exclusion keyword '%s' found for category '%s'", kw, cfg.category)
-                confidence *= _EXCLUSION_PENALTY
-                break
+        if excluded_kw is not None:
+            logger.debug("Exclusion keyword '%s' found for category '%s'", excluded_kw, cfg.category)
+            confidence *= _EXCLUSION_PENALTY
+
+        return confidence, primary_bits, secondary_bits
+
+
+def _detached(result: ClassificationResult) -> ClassificationResult:
+    """Copy of a cached result with its own matched_keywords list, so callers cannot alter the cache."""
+    return result.model_copy(update={"matched_keywords": list(result.matched_keywords)})
+
+
+def _decode_matched(cfg: CategoryConfig, primary_bits: int, secondary_bits: int) -> list[str]:
+    """Expand hit masks back into keyword strings (primary first, in dictionary order)."""
+    matched = [kw for i, kw in enumerate(cfg._primary_tuple) if primary_bits >> i & 1]
+    matched += [kw for i, kw in enumerate(cfg._secondary_tuple) if secondary_bits >> i & 1]
+    return matched
+
 
-        return confidence, matched
+def _first_keyword(keywords: tuple[str, ...], bits: int) -> str | None:
+    """Keyword of the lowest set bit (first in dictionary order), or None."""
+    if not bits:
+        return None
+    return keywords[(bits & -bits).bit_length() - 1]
@@ -2,21 +2,40 @@
 YAML keyword dictionary loader with hot-reload support.
 
 Loads the master categories.yaml index and each individual category
-keyword dictionary. Re-reads files from disk when they change (mtime-based),
-enabling keyword updates without restarting the service (NFR-S2).
+keyword dictionary (YAML, or JSON when the index points at a .json file).
+Re-reads files from disk when they change (mtime-based), enabling keyword
+updates without restarting the service (NFR-S2).
 """
 
 from __future__ import annotations
 
+import json
 import logging
+import os
+import re
+import time
+from functools import cached_property
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
 import yaml
 from pydantic import BaseModel, Field
 
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - optional accelerator
+    ahocorasick = None
+
+try:
+    import re2
+except ImportError:  # pragma: no cover - optional regex engine
+    re2 = None
+
 logger = logging.getLogger(__name__)
 
+# libyaml-backed loader when PyYAML was built with it (pure-Python otherwise)
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 # Default path to keyword dictionaries — relative to project root
 _DEFAULT_CONFIG_DIR = Path(__file__).resolve().parents[2] / "config" / "keywords"
 
@@ -36,9 +55,50 @@ class RegexPattern(BaseModel):
     pattern: str
     group: int = 1
 
+    def model_post_init(self, __context: Any) -> None:
+        # Compile eagerly so an invalid pattern fails the category load
+        self.compiled
+
+    @cached_property
+    def compiled(self) -> re.Pattern[str]:
+        """The pattern compiled once at load; call .search() on it directly."""
+        return _compile_pattern(self.pattern)
+
+
+def _compile_pattern(pattern: str) -> Any:
+    """
+    Compile a field-extraction pattern case-insensitively.
+
+    With KW_REGEX_ENGINE=re2 and google-re2 installed, patterns are compiled
+    with RE2 (linear-time, no catastrophic backtracking). Patterns RE2 cannot
+    express — lookaround, backreferences — fall back to `re`. Note that RE2's
+    \\w, \\d and \\s are ASCII-only, hence opt-in rather than the default.
+    Both engines expose the same search()/group() API used by extract_fields.
+    """
+    if re2 is not None and os.getenv("KW_REGEX_ENGINE", "re").lower() == "re2":
+        options = re2.Options()
+        options.case_sensitive = False
+        options.log_errors = False
+        try:
+            return re2.compile(pattern, options)
+        except re2.error:
+            logger.debug("RE2 cannot compile pattern, using re: %s", pattern)
+    return re.compile(pattern, re.IGNORECASE)
+
 
 class CategoryConfig(BaseModel):
-    """Parsed and validated content of one category YAML file."""
+    """
+    Parsed and validated content of one category YAML file.
+
+    Scoring inputs derived from the fields (keyword tuples, weights,
+    compiled extractors) are cached_property values, all forced in
+    model_post_init so they are computed once at construction rather than
+    on first access from whichever thread gets there first. cached_property
+    stores them in the instance __dict__, so the hot path reads them as
+    plain attributes — pydantic PrivateAttr access goes through __getattr__
+    and is far slower.
+    Configs are treated as immutable once loaded.
+    """
 
     category: str
     display_name: str
@@ -52,12 +112,102 @@ class CategoryConfig(BaseModel):
     mandatory_fields: list[str] = Field(default_factory=list)
     optional_fields: list[str] = Field(default_factory=list)
 
+    def model_post_init(self, __context: Any) -> None:
+        self._primary_tuple
+        self._secondary_tuple
+        self._exclusion_tuple
+        self._pw
+        self._sw
+        self._min_primary
+        self._max_score
+        self._extractors
+
+    @cached_property
+    def _primary_tuple(self) -> tuple[str, ...]:
+        return tuple(self.primary_keywords)
+
+    @cached_property
+    def _secondary_tuple(self) -> tuple[str, ...]:
+        return tuple(self.secondary_keywords)
+
+    @cached_property
+    def _exclusion_tuple(self) -> tuple[str, ...]:
+        return tuple(self.exclusion_keywords)
+
+    @cached_property
+    def _pw(self) -> int:
+        return self.scoring.primary_weight
+
+    @cached_property
+    def _sw(self) -> int:
+        return self.scoring.secondary_weight
+
+    @cached_property
+    def _min_primary(self) -> int:
+        return self.scoring.min_primary_matches
+
+    @cached_property
+    def _max_score(self) -> int:
+        return len(self.primary_keywords) * self._pw + len(self.secondary_keywords) * self._sw
+
+    @cached_property
+    def _extractors(self) -> tuple[tuple[str, re.Pattern[str], int], ...]:
+        """(field_name, compiled_pattern, group) triples in declaration order."""
+        return tuple(
+            (name, rp.compiled, rp.group) for name, rp in self.regex_patterns.items()
+        )
+
     @property
     def all_keywords(self) -> list[str]:
         """Combined list of primary + secondary keywords (lowercased)."""
         return [kw.lower() for kw in self.primary_keywords + self.secondary_keywords]
 
 
+class KeywordIndex:
+    """
+    One Aho-Corasick automaton spanning every category in a snapshot.
+
+    Keyword bits are laid out category after category inside three shared
+    masks (primary, secondary, exclusion), so a single pass over the text
+    yields the hits of all categories at once. `entries` holds, per
+    category in snapshot order, (slug, cfg, offset, width) for each mask.
+
+    `automaton` is None when pyahocorasick is unavailable or a keyword list
+    contains an empty string; the classifier then scores category by category.
+    """
+
+    __slots__ = ("categories", "entries", "automaton")
+
+    def __init__(self, categories: dict[str, CategoryConfig]) -> None:
+        self.categories = categories
+        self.entries: list[tuple[str, CategoryConfig, tuple[tuple[int, int], ...]]] = []
+        self.automaton: Any = None
+
+        masks: dict[str, list[int]] = {}
+        offsets = [0, 0, 0]
+        valid = ahocorasick is not None
+        for slug, cfg in categories.items():
+            layout = []
+            for slot, keywords in enumerate(
+                (cfg.primary_keywords, cfg.secondary_keywords, cfg.exclusion_keywords)
+            ):
+                base = offsets[slot]
+                for idx, kw in enumerate(keywords):
+                    if not kw:
+                        valid = False
+                    masks.setdefault(kw, [0, 0, 0])[slot] |= 1 << (base + idx)
+                layout.append((base, (1 << len(keywords)) - 1))
+                offsets[slot] += len(keywords)
+            self.entries.append((slug, cfg, tuple(layout)))
+
+        if valid and masks:
+            automaton = ahocorasick.Automaton()
+            for kw, (primary, secondary, exclusion) in masks.items():
+                automaton.add_word(kw, (primary, secondary, exclusion))
+            automaton.make_automaton()
+            self.automaton = automaton
+
+
 class CategoryIndex(BaseModel):
     """Parsed content of categories.yaml master index."""
 
@@ -66,7 +216,9 @@ class CategoryIndex(BaseModel):
     categories: list[dict] = Field(default_factory=list)
 
     def enabled_entries(self) -> list[dict]:
-        return [c for c in self.categories if c.get("enabled", True)]
+        """Enabled entries in evaluation order: ascending `priority`, then file order."""
+        enabled = [c for c in self.categories if c.get("enabled", True)]
+        return sorted(enabled, key=lambda c: c.get("priority", float("inf")))
 
 
 # ---------------------------------------------------------------------------
@@ -78,7 +230,10 @@ class KeywordConfigLoader:
     Loads and caches keyword dictionaries from YAML files.
 
     Hot-reload: call get_categories() on each request — it re-reads
-    any files whose mtime has changed since the last load.
+    any files whose mtime has changed since the last load. The mtime
+    checks run at most once per reload interval (KW_RELOAD_INTERVAL
+    seconds, default 2); calls in between return the last snapshot, and
+    the snapshot is only rebuilt when the index or a keyword file changes.
 
     Usage:
         loader = KeywordConfigLoader()
@@ -86,10 +241,21 @@ class KeywordConfigLoader:
         invoice_cfg = categories["invoice"]
     """
 
-    def __init__(self, config_dir: Optional[Path] = None) -> None:
+    def __init__(
+        self,
+        config_dir: Optional[Path] = None,
+        reload_interval_s: Optional[float] = None,
+    ) -> None:
         self._config_dir = config_dir or _DEFAULT_CONFIG_DIR
         self._cache: dict[str, CategoryConfig] = {}
         self._mtimes: dict[str, float] = {}
+        if reload_interval_s is None:
+            reload_interval_s = float(os.getenv("KW_RELOAD_INTERVAL", "2"))
+        self._reload_interval_s = reload_interval_s
+        self._last_check_monotonic = 0.0
+        self._snapshot: Optional[dict[str, CategoryConfig]] = None
+        self._snapshot_paths: list[Path] = []
+        self._keyword_index: Optional[KeywordIndex] = None
 
     # ------------------------------------------------------------------
     # Public API
@@ -99,17 +265,35 @@ class KeywordConfigLoader:
         """
         Return all enabled categories as {category_slug: CategoryConfig}.
         Re-reads any files changed on disk since last call.
+
+        The returned dict is a shared snapshot — the same object is handed
+        out until a file changes — so callers must treat it as read-only.
         """
+        now = time.monotonic()
+        if self._snapshot is not None:
+            if now - self._last_check_monotonic < self._reload_interval_s:
+                return self._snapshot
+            self._last_check_monotonic = now
+            if not any(self._is_stale(path) for path in self._snapshot_paths):
+                return self._snapshot
+
+        index_path = self._config_dir / "categories.yaml"
         index = self._load_index()
+        self._mtimes[str(index_path)] = index_path.stat().st_mtime
         result: dict[str, CategoryConfig] = {}
+        paths: list[Path] = [index_path]
 
         for entry in index.enabled_entries():
             slug = entry["category"]
             filename = entry["file"]
             path = self._config_dir / filename
+            paths.append(path)
 
             if not path.exists():
                 logger.warning("Keyword file not found, skipping: %s", path)
+                # Forget the file so it is only re-checked once it reappears
+                self._mtimes.pop(str(path), None)
+                self._cache.pop(slug, None)
                 continue
 
             if self._is_stale(path):
@@ -123,8 +307,22 @@ class KeywordConfigLoader:
             if slug in self._cache:
                 result[slug] = self._cache[slug]
 
+        self._snapshot = result
+        self._snapshot_paths = paths
+        self._last_check_monotonic = now
         return result
 
+    def get_keyword_index(self) -> KeywordIndex:
+        """
+        Return the shared keyword automaton for the current snapshot.
+        Rebuilt only when get_categories() hands out a new snapshot.
+        """
+        categories = self.get_categories()
+        index = self._keyword_index
+        if index is None or index.categories is not categories:
+            index = self._keyword_index = KeywordIndex(categories)
+        return index
+
     def get_category(self, slug: str) -> Optional[CategoryConfig]:
         """Return a single category config by slug, or None if not found."""
         return self.get_categories().get(slug)
@@ -133,6 +331,7 @@ class KeywordConfigLoader:
         """Force a full reload from disk, bypassing the mtime cache."""
         self._cache.clear()
         self._mtimes.clear()
+        self._snapshot = None
         return self.get_categories()
 
     # ------------------------------------------------------------------
@@ -146,14 +345,12 @@ class KeywordConfigLoader:
                 f"Master categories index not found: {index_path}\n"
                 "Expected at config/keywords/categories.yaml"
             )
-        with open(index_path, encoding="utf-8") as f:
-            raw = yaml.safe_load(f)
+        raw = _read_config_file(index_path)
         return CategoryIndex(**raw)
 
     def _load_category(self, path: Path) -> Optional[CategoryConfig]:
         try:
-            with open(path, encoding="utf-8") as f:
-                raw = yaml.safe_load(f)
+            raw = _read_config_file(path)
 
             # Normalise regex_patterns: YAML may store as plain dicts
             if "regex_patterns" in raw and raw["regex_patterns"]:
@@ -174,14 +371,30 @@ class KeywordConfigLoader:
             return None
 
     def _is_stale(self, path: Path) -> bool:
-        """Return True if the file has changed since last load (or was never loaded)."""
+        """
+        Return True if the file has changed since last load (or was never loaded).
+        A file that was loaded but can no longer be stat'ed (deleted) is stale too.
+        """
         try:
             current_mtime = path.stat().st_mtime
         except OSError:
-            return False
+            return str(path) in self._mtimes
         return self._mtimes.get(str(path), -1) != current_mtime
 
 
+def _read_config_file(path: Path) -> Any:
+    """
+    Parse a keyword config file — JSON by suffix, YAML (libyaml if available) otherwise.
+
+    The file is handed to the parser in binary mode: libyaml and json both
+    detect UTF-8 themselves, so no intermediate decoded str copy is made.
+    """
+    with open(path, "rb") as f:
+        if path.suffix.lower() == ".json":
+            return json.load(f)
+        return yaml.load(f, Loader=_YAML_LOADER)
+
+
 # ---------------------------------------------------------------------------
 # Module-level singleton — import and use directly in pipeline nodes
 # ---------------------------------------------------------------------------
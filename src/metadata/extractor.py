@@ -16,105 +16,209 @@ Extracts two kinds of metadata from document files:
 
 from __future__ import annotations
 
+import hashlib
 import logging
+import mmap
 import os
+import threading
+from collections import OrderedDict
 from datetime import datetime, timezone
+from io import BytesIO
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 import filetype
 
 from src.models.schemas import DocumentMetadata
 
+# Optional format libraries, resolved once at import; None when not installed
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # pragma: no cover - installed with docling
+    pdfium = None
+
+try:
+    from docx import Document as DocxDocument
+except ImportError:  # pragma: no cover - optional dependency
+    DocxDocument = None
+
+try:
+    from pptx import Presentation
+except ImportError:  # pragma: no cover - optional dependency
+    Presentation = None
+
 logger = logging.getLogger(__name__)
 
+# Signatures of the formats this engine handles most, checked before the
+# generic filetype matcher list
+_MAGIC_PREFIXES: tuple[tuple[bytes, str], ...] = (
+    (b"%PDF-", "application/pdf"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+)
+
+# Same table indexed by the first two bytes (distinct for every entry), so a
+# sniff is one dict lookup plus one startswith instead of a scan
+_MAGIC_BY_LEAD: dict[bytes, tuple[bytes, str]] = {
+    prefix[:2]: (prefix, mime) for prefix, mime in _MAGIC_PREFIXES
+}
+
+# Longest prefix any signature check reads (filetype inspects at most 8 KiB);
+# callers holding a large buffer or mmap pass only this much to sniff_mime
+SNIFF_BYTES = 8192
+
+# Internal-metadata results for in-memory documents, keyed by (extension key,
+# SHA-256 of the bytes), so re-submitting the same upload skips the parser
+_INTERNAL_CACHE_SIZE = 128
+_internal_cache: OrderedDict[tuple[str, bytes], dict] = OrderedDict()
+_internal_cache_lock = threading.Lock()
+
+# ZIP containers are resolved to the Office Open XML type by extension, once
+# an OOXML entry name (the content-types part or the format's own folder)
+# shows up among the sniffed local file headers
+_ZIP_PREFIX = b"PK\x03\x04"
+_OOXML_CONTENT_TYPES = b"[Content_Types].xml"
+_OOXML_BY_EXT: dict[str, tuple[str, bytes]] = {
+    ".docx": ("application/vnd.openxmlformats-officedocument.wordprocessingml.document", b"word/"),
+    ".pptx": ("application/vnd.openxmlformats-officedocument.presentationml.presentation", b"ppt/"),
+    ".xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", b"xl/"),
+}
+
 
 def extract_metadata(
-    file_bytes: bytes,
+    file_bytes: bytes | mmap.mmap,
     filename: str,
     source_path: Optional[str] = None,
 ) -> DocumentMetadata:
     """
     Extract filesystem + document-internal metadata.
 
+    Detects the format once from extension and magic bytes, collects both
+    kinds of fields into one dict, and builds DocumentMetadata a single time
+    (unvalidated: the values come from this module, already typed).
+
     Args:
-        file_bytes: Raw document bytes.
+        file_bytes: Raw document bytes (or a read-only mmap of the file).
         filename: Original filename (used for extension detection).
         source_path: Optional absolute path on disk (enables filesystem timestamps).
+            When it can be stat'ed, format parsers open the file directly
+            instead of copying file_bytes into their own buffers.
 
     Returns:
         Populated DocumentMetadata instance.
     """
-    meta = _extract_filesystem_metadata(file_bytes, filename, source_path)
-    meta = _extract_document_metadata(file_bytes, meta)
-    return meta
-
-
-def _extract_filesystem_metadata(
-    file_bytes: bytes,
-    filename: str,
-    source_path: Optional[str] = None,
-) -> DocumentMetadata:
-    """Extract size, extension, MIME type, and filesystem timestamps."""
     ext = Path(filename).suffix.lower()
 
     # MIME detection via magic bytes
-    kind = filetype.guess(file_bytes)
-    mime = kind.mime if kind else None
+    mime = sniff_mime(file_bytes[:SNIFF_BYTES], ext)
 
-    # Filesystem timestamps (only available if source_path points to real file)
-    created_at: Optional[datetime] = None
-    modified_at: Optional[datetime] = None
+    fields: dict = {
+        "file_size_bytes": len(file_bytes),
+        "file_extension": ext,
+        "mime_type": mime,
+    }
 
+    # Filesystem timestamps (only available if source_path points to real file)
+    source: bytes | str | None = None
     if source_path:
         try:
             stat = os.stat(source_path)
-            created_at = datetime.fromtimestamp(stat.st_ctime, tz=timezone.utc)
-            modified_at = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+            fields["created_at"] = datetime.fromtimestamp(stat.st_ctime, tz=timezone.utc)
+            fields["modified_at"] = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+            source = source_path
         except OSError as exc:
             logger.warning("Could not stat '%s': %s", source_path, exc)
 
-    return DocumentMetadata(
-        file_size_bytes=len(file_bytes),
-        file_extension=ext,
-        mime_type=mime,
-        created_at=created_at,
-        modified_at=modified_at,
-    )
+    # Document-internal metadata based on detected type; PDF content is
+    # recognised by its signature whatever the extension
+    key = ".pdf" if mime == "application/pdf" else ext
+    extractor = _EXTRACTORS.get(key)
+    if extractor is not None:
+        if source is not None:
+            fields.update(extractor(source))
+        elif file_bytes:
+            fields.update(_extract_internal_cached(key, extractor, file_bytes))
+
+    # Every field was produced above with its declared type, so skip validation
+    return DocumentMetadata.model_construct(**fields)
+
+
+def _extract_internal_cached(
+    key: str,
+    extractor: Callable[[bytes | str], dict],
+    file_bytes: bytes | mmap.mmap,
+) -> dict:
+    """Run an internal-metadata extractor on bytes, memoised by content digest."""
+    cache_key = (key, hashlib.sha256(file_bytes, usedforsecurity=False).digest())
+    with _internal_cache_lock:
+        cached = _internal_cache.get(cache_key)
+        if cached is not None:
+            _internal_cache.move_to_end(cache_key)
+            return dict(cached)
+
+    data = file_bytes if isinstance(file_bytes, bytes) else file_bytes[:]
+    fields = extractor(data)
+    with _internal_cache_lock:
+        _internal_cache[cache_key] = fields
+        if len(_internal_cache) > _INTERNAL_CACHE_SIZE:
+            _internal_cache.popitem(last=False)
+    return dict(fields)
+
+
+def clear_metadata_cache() -> None:
+    """Drop memoised internal-metadata results (used by tests)."""
+    with _internal_cache_lock:
+        _internal_cache.clear()
+
+
+def sniff_mime(file_bytes: bytes, ext: str = "") -> Optional[str]:
+    """
+    Detect a MIME type from magic bytes.
 
+    Checks a short table of the formats this engine sees most (PDF, PNG,
+    JPEG) through a lead-byte lookup and one prefix comparison. A ZIP named
+    .docx/.pptx/.xlsx takes that Office type only when an OOXML entry name
+    appears in the sniffed bytes, so a renamed .zip or .jar does not pass as
+    a document. Anything else falls back to filetype's full matcher list.
+    """
+    known = _MAGIC_BY_LEAD.get(file_bytes[:2])
+    if known is not None and file_bytes.startswith(known[0]):
+        return known[1]
+    ooxml = _OOXML_BY_EXT.get(ext)
+    if ooxml is not None and file_bytes.startswith(_ZIP_PREFIX) and (
+        _OOXML_CONTENT_TYPES in file_bytes or ooxml[1] in file_bytes
+    ):
+        return ooxml[0]
 
-def _extract_document_metadata(
-    file_bytes: bytes,
-    meta: DocumentMetadata,
-) -> DocumentMetadata:
-    """Extract document-internal metadata based on detected type."""
-    ext = meta.file_extension
+    kind = filetype.guess(file_bytes)
+    return kind.mime if kind else None
 
-    if ext == ".pdf" or (meta.mime_type and "pdf" in meta.mime_type):
-        return _extract_pdf_metadata(file_bytes, meta)
-    elif ext == ".docx":
-        return _extract_docx_metadata(file_bytes, meta)
-    elif ext == ".pptx":
-        return _extract_pptx_metadata(file_bytes, meta)
 
-    return meta
+# DocumentMetadata field -> PDF Info dictionary key
+_PDF_INFO_KEYS: tuple[tuple[str, str], ...] = (
+    ("author", "Author"),
+    ("title", "Title"),
+    ("producer", "Producer"),
+    ("creation_date", "CreationDate"),
+)
 
 
-def _extract_pdf_metadata(file_bytes: bytes, meta: DocumentMetadata) -> DocumentMetadata:
+def _extract_pdf_metadata(source: bytes | str) -> dict:
     """Extract PDF metadata using pypdfium2 (already installed via docling)."""
-    try:
-        import pypdfium2 as pdfium
+    fields: dict = {}
+    if pdfium is None:
+        logger.debug("pypdfium2 not installed — skipping PDF internal metadata")
+        return fields
 
-        pdf = pdfium.PdfDocument(file_bytes)
-        meta.page_count = len(pdf)
+    try:
+        pdf = pdfium.PdfDocument(source)
+        fields["page_count"] = len(pdf)
 
-        # pypdfium2 exposes metadata via get_metadata_dict
+        # Read only the Info keys we map (get_metadata_dict would fetch all
+        # eight); page count and Info lookups never load page objects
         try:
-            pdf_meta = pdf.get_metadata_dict()
-            meta.author = pdf_meta.get("Author") or None
-            meta.title = pdf_meta.get("Title") or None
-            meta.producer = pdf_meta.get("Producer") or None
-            meta.creation_date = pdf_meta.get("CreationDate") or None
+            for field, key in _PDF_INFO_KEYS:
+                fields[field] = pdf.get_metadata_value(key) or None
         except Exception:
             # Some PDFs have no metadata block — that's fine
             pass
@@ -123,52 +227,63 @@ def _extract_pdf_metadata(file_bytes: bytes, meta: DocumentMetadata) -> Document
     except Exception as exc:
         logger.warning("Failed to extract PDF metadata: %s", exc)
 
-    return meta
+    return fields
 
 
-def _extract_docx_metadata(file_bytes: bytes, meta: DocumentMetadata) -> DocumentMetadata:
+def _extract_docx_metadata(source: bytes | str) -> dict:
     """Extract DOCX metadata using python-docx (optional dependency)."""
-    try:
-        from docx import Document
-        from io import BytesIO
-
-        doc = Document(BytesIO(file_bytes))
-        props = doc.core_properties
-
-        meta.author = props.author or None
-        meta.title = props.title or None
-        if props.created:
-            meta.creation_date = props.created.isoformat()
-        if props.last_modified_by:
-            meta.producer = props.last_modified_by
-    except ImportError:
+    fields: dict = {}
+    if DocxDocument is None:
         logger.debug("python-docx not installed — skipping DOCX internal metadata")
+        return fields
+
+    try:
+        doc = DocxDocument(_as_stream(source))
+        fields.update(_core_properties_fields(doc.core_properties))
     except Exception as exc:
         logger.warning("Failed to extract DOCX metadata: %s", exc)
 
-    return meta
+    return fields
 
 
-def _extract_pptx_metadata(file_bytes: bytes, meta: DocumentMetadata) -> DocumentMetadata:
+def _extract_pptx_metadata(source: bytes | str) -> dict:
     """Extract PPTX metadata using python-pptx (optional dependency)."""
+    fields: dict = {}
+    if Presentation is None:
+        logger.debug("python-pptx not installed — skipping PPTX internal metadata")
+        return fields
+
     try:
-        from pptx import Presentation
-        from io import BytesIO
+        prs = Presentation(_as_stream(source))
+        fields.update(_core_properties_fields(prs.core_properties))
+        fields["page_count"] = len(prs.slides)
+    except Exception as exc:
+        logger.warning("Failed to extract PPTX metadata: %s", exc)
 
-        prs = Presentation(BytesIO(file_bytes))
-        props = prs.core_properties
+    return fields
 
-        meta.author = props.author or None
-        meta.title = props.title or None
-        if props.created:
-            meta.creation_date = props.created.isoformat()
-        if props.last_modified_by:
-            meta.producer = props.last_modified_by
 
-        meta.page_count = len(prs.slides)
-    except ImportError:
-        logger.debug("python-pptx not installed — skipping PPTX internal metadata")
-    except Exception as exc:
-        logger.warning("Failed to extract PPTX metadata: %s", exc)
+def _as_stream(source: bytes | str):
+    """python-docx/pptx take a path or a file-like object, not raw bytes."""
+    return BytesIO(source) if isinstance(source, bytes) else source
+
+
+def _core_properties_fields(props) -> dict:
+    """Map Office Open XML core properties onto DocumentMetadata fields."""
+    fields: dict = {
+        "author": props.author or None,
+        "title": props.title or None,
+    }
+    if props.created:
+        fields["creation_date"] = props.created.isoformat()
+    if props.last_modified_by:
+        fields["producer"] = props.last_modified_by
+    return fields
+
 
-    return meta
+# Per-format internal metadata extractors, keyed by lowercase extension
+_EXTRACTORS: dict[str, Callable[[bytes | str], dict]] = {
+    ".pdf": _extract_pdf_metadata,
+    ".docx": _extract_docx_metadata,
+    ".pptx": _extract_pptx_metadata,
+}
@@ -7,11 +7,50 @@ Every node in the LangGraph graph reads/writes these types.
 
 from __future__ import annotations
 
+import os
+import random
+import time
 from datetime import datetime, timezone
+from functools import partial
 from typing import Any, Literal, Optional
-from uuid import uuid4
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+
+# ---------------------------------------------------------------------------
+# Identifiers
+# ---------------------------------------------------------------------------
+
+# Private PRNG for new_id: seeding or reseeding the global `random` module
+# elsewhere must not make IDs repeat, and forked workers must not share state.
+_id_rng = random.Random(os.urandom(16))
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=lambda: _id_rng.seed(os.urandom(16)))
+
+
+def new_id() -> str:
+    """
+    Return a time-ordered identifier in UUID version 7 layout.
+
+    A 48-bit Unix millisecond timestamp is followed by 74 bits from the
+    module PRNG (seeded from os.urandom and reseeded after fork), so no
+    syscall is made per ID and IDs sort by creation time. Not for secrets.
+    """
+    ms = time.time_ns() // 1_000_000
+    rand = _id_rng.getrandbits(74)
+    value = (
+        (ms & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76                      # version
+        | (rand >> 62) << 64             # rand_a (12 bits)
+        | 0b10 << 62                     # RFC 4122 variant
+        | rand & 0x3FFF_FFFF_FFFF_FFFF   # rand_b (62 bits)
+    )
+    h = f"{value:032x}"
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+# Timestamp default factory: a C-level partial, no Python frame per call
+_utcnow = partial(datetime.now, timezone.utc)
 
 
 # ---------------------------------------------------------------------------
@@ -24,6 +63,8 @@ class DocumentMetadata(BaseModel):
     Combines filesystem attributes and document-internal properties.
     """
 
+    model_config = ConfigDict(frozen=True)
+
     # Filesystem metadata
     file_size_bytes: int = 0
     """File size in bytes."""
@@ -64,6 +105,8 @@ class DocumentMetadata(BaseModel):
 class ClassificationResult(BaseModel):
     """Intermediate output produced by the keyword engine (or LLM fallback)."""
 
+    model_config = ConfigDict(frozen=True)
+
     category: str
     """Matched document category slug, e.g. 'invoice', 'contract'."""
 
@@ -93,7 +136,7 @@ class ExtractedDocument(BaseModel):
     Stored in SQLite and returned by the REST API.
     """
 
-    document_id: str = Field(default_factory=lambda: str(uuid4()))
+    document_id: str = Field(default_factory=new_id)
     """Unique identifier for this processing run."""
 
     source_filename: str
@@ -134,7 +177,7 @@ class ExtractedDocument(BaseModel):
     validation_errors: list[str] = Field(default_factory=list)
     """Field-level error messages from Pydantic validation. Empty when valid."""
 
-    processed_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    processed_at: datetime = Field(default_factory=_utcnow)
     """UTC timestamp when this document completed the pipeline."""
 
     processing_duration_ms: int = 0
@@ -156,7 +199,9 @@ class AuditEntry(BaseModel):
     Persisted to an append-only JSONL file.
     """
 
-    audit_id: str = Field(default_factory=lambda: str(uuid4()))
+    model_config = ConfigDict(frozen=True)
+
+    audit_id: str = Field(default_factory=new_id)
     """Unique identifier for this audit entry."""
 
     document_id: str
@@ -165,7 +210,7 @@ class AuditEntry(BaseModel):
     source_filename: str
     """Original filename — duplicated here so the audit log is self-contained."""
 
-    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: datetime = Field(default_factory=_utcnow)
     """UTC timestamp when this audit entry was written."""
 
     extraction_method: Literal["deterministic", "llm_fallback", "unclassified"]
@@ -194,9 +239,14 @@ class AuditEntry(BaseModel):
 
     @classmethod
     def from_extracted(cls, doc: ExtractedDocument) -> "AuditEntry":
-        """Convenience constructor: build an AuditEntry from an ExtractedDocument."""
+        """
+        Convenience constructor: build an AuditEntry from an ExtractedDocument.
+
+        The source document has already been validated, so fields are copied
+        without re-validation; audit_id still comes from its default factory.
+        """
         outcome_map = {"valid": "passed", "invalid": "failed", "partial": "partial"}
-        return cls(
+        return cls.model_construct(
             document_id=doc.document_id,
             source_filename=doc.source_filename,
             timestamp=doc.processed_at,
@@ -221,10 +271,12 @@ class FeedbackRecord(BaseModel):
     Written to the feedback JSONL file for keyword dictionary review.
     """
 
-    feedback_id: str = Field(default_factory=lambda: str(uuid4()))
+    model_config = ConfigDict(frozen=True)
+
+    feedback_id: str = Field(default_factory=new_id)
     document_id: str
     source_filename: str
-    flagged_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    flagged_at: datetime = Field(default_factory=_utcnow)
     predicted_category: str
     reviewer_correct_category: str
     reviewer_notes: Optional[str] = None
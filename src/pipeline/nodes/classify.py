@@ -10,13 +10,27 @@ If confidence <  threshold  → sets escalation_reason, defers to llm.py.
 from __future__ import annotations
 
 import logging
-from typing import Any
+from typing import Any, Optional
 
 from src.classifiers.engine import KeywordClassifier
 from src.config.loader import get_loader
 
 logger = logging.getLogger(__name__)
 
+# ---------------------------------------------------------------------------
+# Module-level classifier singleton (keeps its result cache across documents)
+# ---------------------------------------------------------------------------
+
+_classifier: Optional[KeywordClassifier] = None
+
+
+def _get_classifier() -> KeywordClassifier:
+    """Return the module-level KeywordClassifier, building it on first call."""
+    global _classifier
+    if _classifier is None:
+        _classifier = KeywordClassifier()
+    return _classifier
+
 
 def classify_node(state: dict[str, Any]) -> dict[str, Any]:
     """
@@ -36,20 +50,20 @@ def classify_node(state: dict[str, Any]) -> dict[str, Any]:
         logger.error("classify_node: no parsed_markdown in state")
         return {"pipeline_error": "No parsed Markdown available for classification"}
 
-    classifier = KeywordClassifier()
+    classifier = _get_classifier()
     result = classifier.classify(parsed_markdown)
 
     output: dict[str, Any] = {
         "document_category": result.category,
         "classification_method": result.method,
-        "classification_confidence": result.confidence,
+        # Rounded at the producer, as llm.py does for LLM confidences
+        "classification_confidence": round(result.confidence, 4),
         "matched_keywords": result.matched_keywords,
     }
 
     if result.method == "deterministic":
         # Extract fields using regex patterns for the winning category
-        loader = get_loader()
-        categories = loader.get_categories()
+        categories = get_loader().get_categories()
         category_cfg = categories.get(result.category)
         if category_cfg:
             output["extracted_fields"] = classifier.extract_fields(
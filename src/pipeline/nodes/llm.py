@@ -5,29 +5,51 @@ Sprint: S6 (implemented early per client request)
 Invoked ONLY when keyword engine confidence < threshold.
 Uses the Anthropic Claude API (default: claude-haiku-4-5-20251001).
 
-Retry policy: up to LLM_MAX_RETRIES (default 2) with exponential backoff.
+Retry policy: up to LLM_MAX_RETRIES (default 2) with jittered exponential backoff,
+honouring Retry-After on rate limits.
+An async variant (llm_fallback_node_async / llm_fallback_gather) overlaps
+requests for batches, bounded by LLM_CONCURRENCY (default 8) and, when
+LLM_RPM is set, a requests-per-minute token bucket.
+For offline bulk runs, llm_fallback_batch submits all escalations through
+the Message Batches API (half price, results within 24h).
 Graceful degradation: if API key missing or all retries fail, sets llm_unavailable=True.
 All LLM invocations are logged with the escalation reason (NFR-O1, FR3).
 """
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import os
-import time
-from typing import Any
+import random
+import re
+import threading
+from functools import lru_cache
+from time import monotonic, sleep
+from typing import Any, Collection, NamedTuple, Sequence
 
 import anthropic
 
 from src.config.loader import load_categories
 
+# orjson (pulled in by langgraph/langsmith) parses responses faster; stdlib otherwise
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 # Defaults (overridable via .env)
 _DEFAULT_MODEL = "claude-haiku-4-5-20251001"
 _DEFAULT_MAX_RETRIES = 2
 _DEFAULT_RETRY_BASE_DELAY = 1.0
+_MAX_RETRY_DELAY = 60.0
+_DEFAULT_CONCURRENCY = 8
+_DEFAULT_BATCH_POLL_INTERVAL = 10.0
+_MAX_BATCH_POLL_INTERVAL = 300.0
+_DEFAULT_TIMEOUT = 30.0
 _MAX_DOC_CHARS = 4000
 
 # Prompt template
@@ -37,55 +59,127 @@ _SYSTEM_PROMPT = (
     "Respond with valid JSON only — no markdown, no explanation."
 )
 
-_USER_PROMPT_TEMPLATE = """\
-Classify this document into exactly one of these categories: {categories}
+# Task and output format; static, so it sits in the cached system prefix
+# and the user message carries only per-document content
+_TASK_INSTRUCTIONS = (
+    "Classify each document into exactly one of the valid categories.\n"
+    'Respond with JSON only: {"category": "<category_slug>", "confidence": <0.0-1.0>}'
+)
 
-Respond with JSON only: {{"category": "<category_slug>", "confidence": <0.0-1.0>}}
 
-Escalation context: {escalation_reason}
-Keyword engine's best guess: {best_guess} (confidence: {best_confidence:.4f})
+# Last categories snapshot seen, with the lookups derived from it
+_categories_memo: tuple[dict[str, Any], tuple[str, ...], frozenset[str]] | None = None
 
-Document text:
-{document_text}"""
 
+def _get_valid_categories() -> tuple[tuple[str, ...], frozenset[str]]:
+    """
+    Load all enabled category slugs from the keyword config.
 
-def _get_valid_categories() -> list[str]:
-    """Load all enabled category slugs from the keyword config."""
+    Returns a sorted tuple (for the prompt) and a frozenset (for validating
+    responses). The loader returns the same dict until the config changes,
+    so both are rebuilt only when that snapshot is replaced.
+    """
+    global _categories_memo
     try:
         categories = load_categories()
-        return sorted(categories.keys())
     except Exception as exc:
         logger.warning("Could not load categories for LLM prompt: %s", exc)
-        return []
+        return (), frozenset()
+
+    memo = _categories_memo
+    if memo is None or memo[0] is not categories:
+        ordered = tuple(sorted(categories.keys()))
+        memo = _categories_memo = (categories, ordered, frozenset(ordered))
+    return memo[1], memo[2]
 
 
-def _build_prompt(state: dict[str, Any], valid_categories: list[str]) -> str:
-    """Build the user prompt from pipeline state."""
-    return _USER_PROMPT_TEMPLATE.format(
-        categories=", ".join(valid_categories),
-        escalation_reason=state.get("llm_escalation_reason", "Unknown"),
-        best_guess=state.get("document_category", "unclassified"),
-        best_confidence=state.get("classification_confidence", 0.0),
-        document_text=state.get("parsed_markdown", "")[:_MAX_DOC_CHARS],
+@lru_cache(maxsize=8)
+def _system_blocks(valid_categories: tuple[str, ...]) -> tuple[dict[str, Any], ...]:
+    """
+    System prompt as content blocks with a prompt-cache breakpoint.
+
+    The instructions, output format and category list are identical for
+    every request against the same config, so they form the cacheable
+    prefix; everything per-document stays in the user message. Anthropic
+    ignores the breakpoint when the prefix is below the model's minimum
+    cacheable length.
+    """
+    text = (
+        f"{_SYSTEM_PROMPT}\n\n{_TASK_INSTRUCTIONS}\n\n"
+        f"Valid categories: {', '.join(valid_categories)}"
+    )
+    return ({"type": "text", "text": text, "cache_control": {"type": "ephemeral"}},)
+
+
+def _build_prompt(state: dict[str, Any], valid_categories: Sequence[str]) -> str:
+    """Build the per-document user prompt from pipeline state."""
+    return (
+        f"Escalation context: {state.get('llm_escalation_reason', 'Unknown')}\n"
+        f"Keyword engine's best guess: {state.get('document_category', 'unclassified')} "
+        f"(confidence: {state.get('classification_confidence', 0.0):.4f})\n"
+        f"\n"
+        f"Document text:\n"
+        f"{state.get('parsed_markdown', '')[:_MAX_DOC_CHARS]}"
     )
 
 
-def _parse_llm_response(text: str, valid_categories: list[str]) -> dict[str, Any] | None:
+# {"category": "<slug>", "confidence": <JSON number>} and nothing else
+_RESPONSE_RE = re.compile(
+    r'\s*\{[ \t\n\r]*"category"[ \t\n\r]*:[ \t\n\r]*"([^"\\\x00-\x1f]*)"[ \t\n\r]*,'
+    r'[ \t\n\r]*"confidence"[ \t\n\r]*:[ \t\n\r]*(-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?)'
+    r'[ \t\n\r]*\}\s*'
+)
+
+
+def _loads_json(text: str) -> Any:
+    # orjson tolerates surrounding whitespace; its error subclasses JSONDecodeError
+    return orjson.loads(text) if orjson is not None else json.loads(text.strip())
+
+
+def _loads_json_object(text: str) -> dict[str, Any] | None:
     """
-    Parse the LLM's JSON response and validate the category.
-    Returns {"category": str, "confidence": float} or None on failure.
+    Parse a reply as a JSON object, or None if it holds none.
+
+    When the whole reply is not JSON (a code fence or a sentence around the
+    object), retry on the span from the first '{' to the last '}' — two
+    linear scans, no regex backtracking over model output.
     """
     try:
-        data = json.loads(text.strip())
+        data = _loads_json(text)
     except json.JSONDecodeError:
-        logger.warning("LLM returned invalid JSON: %s", text[:200])
-        return None
+        start, end = text.find("{"), text.rfind("}")
+        if start < 0 or end <= start or (start, end) == (0, len(text) - 1):
+            return None
+        try:
+            data = _loads_json(text[start:end + 1])
+        except json.JSONDecodeError:
+            return None
+    return data if isinstance(data, dict) else None
 
-    category = data.get("category")
-    confidence = data.get("confidence")
+
+def _parse_llm_response(text: str, valid_categories: Collection[str]) -> dict[str, Any] | None:
+    """
+    Parse the LLM's JSON response and validate the category.
+    Returns {"category": str, "confidence": float} or None on failure.
+    """
+    # Fast path: the exact object shape the prompt asks for, which is valid
+    # JSON by construction; anything else goes through the full parser
+    match = _RESPONSE_RE.fullmatch(text)
+    if match is not None:
+        category, confidence = match.group(1), match.group(2)
+    else:
+        data = _loads_json_object(text)
+        if data is None:
+            logger.warning("LLM returned invalid JSON: %s", text[:200])
+            return None
+
+        category = data.get("category")
+        confidence = data.get("confidence")
 
     if category not in valid_categories:
-        logger.warning("LLM returned unknown category '%s' (valid: %s)", category, valid_categories)
+        logger.warning(
+            "LLM returned unknown category '%s' (valid: %s)", category, sorted(valid_categories),
+        )
         return None
 
     try:
@@ -98,79 +192,379 @@ def _parse_llm_response(text: str, valid_categories: list[str]) -> dict[str, Any
     return {"category": category, "confidence": round(confidence, 4)}
 
 
-def llm_fallback_node(state: dict[str, Any]) -> dict[str, Any]:
-    """
-    LangGraph node: semantic inference when keyword engine is insufficient.
+class _LlmCall(NamedTuple):
+    """Everything one fallback request needs, resolved from env and state."""
 
-    Input state keys:  parsed_markdown, llm_escalation_reason,
-                       document_category, classification_confidence
-    Output state keys: document_category, classification_method ('llm_fallback'),
-                       classification_confidence, llm_unavailable
-    """
+    api_key: str
+    model: str
+    max_retries: int
+    base_delay: float
+    valid_categories: tuple[str, ...]
+    valid_set: frozenset[str]
+    user_prompt: str
+
+
+# API errors worth retrying
+_RETRYABLE_ERRORS = (
+    anthropic.APIError,
+    anthropic.APIConnectionError,
+    anthropic.RateLimitError,
+)
+
+
+def _prepare_call(state: dict[str, Any]) -> _LlmCall | None:
+    """Resolve API key, settings and prompt. Returns None if the LLM is unavailable."""
     api_key = os.environ.get("ANTHROPIC_API_KEY", "").strip()
     if not api_key:
         logger.warning("ANTHROPIC_API_KEY not set — LLM fallback unavailable")
-        return {"llm_unavailable": True}
+        return None
 
     model = os.environ.get("ANTHROPIC_MODEL", _DEFAULT_MODEL)
     max_retries = int(os.environ.get("LLM_MAX_RETRIES", _DEFAULT_MAX_RETRIES))
     base_delay = float(os.environ.get("LLM_RETRY_BASE_DELAY", _DEFAULT_RETRY_BASE_DELAY))
 
-    valid_categories = _get_valid_categories()
+    valid_categories, valid_set = _get_valid_categories()
     if not valid_categories:
         logger.warning("No valid categories loaded — LLM fallback unavailable")
-        return {"llm_unavailable": True}
+        return None
+
+    return _LlmCall(
+        api_key=api_key,
+        model=model,
+        max_retries=max_retries,
+        base_delay=base_delay,
+        valid_categories=valid_categories,
+        valid_set=valid_set,
+        user_prompt=_build_prompt(state, valid_categories),
+    )
+
+
+def _request_kwargs(call: _LlmCall) -> dict[str, Any]:
+    """Keyword arguments for client.messages.create()."""
+    return {
+        "model": call.model,
+        "max_tokens": 150,
+        "system": list(_system_blocks(call.valid_categories)),
+        "messages": [{"role": "user", "content": call.user_prompt}],
+    }
+
 
-    user_prompt = _build_prompt(state, valid_categories)
-    client = anthropic.Anthropic(api_key=api_key)
+def _result_from_response(
+    response: Any,
+    call: _LlmCall,
+    attempt: int,
+) -> tuple[dict[str, Any] | None, Exception | None]:
+    """
+    Turn an API response into node output.
+    Returns (output, None) on success or (None, error) if it must be retried.
+    """
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        logger.debug(
+            "LLM usage: input=%s cache_read=%s cache_write=%s",
+            getattr(usage, "input_tokens", None),
+            getattr(usage, "cache_read_input_tokens", None),
+            getattr(usage, "cache_creation_input_tokens", None),
+        )
+
+    response_text = response.content[0].text
+    parsed = _parse_llm_response(response_text, call.valid_set)
+
+    if parsed is not None:
+        logger.info(
+            "LLM classified as '%s' (confidence=%.4f) on attempt %d",
+            parsed["category"], parsed["confidence"], attempt + 1,
+        )
+        return {
+            "document_category": parsed["category"],
+            "classification_method": "llm_fallback",
+            "classification_confidence": parsed["confidence"],
+            "llm_unavailable": False,
+        }, None
+
+    # Invalid response — treat as failure, retry
+    logger.warning("LLM response could not be parsed (attempt %d)", attempt + 1)
+    return None, ValueError(f"Unparseable LLM response: {response_text[:200]}")
+
+
+def _retry_delay(
+    call: _LlmCall,
+    attempt: int,
+    error: Exception | None = None,
+) -> float | None:
+    """
+    Backoff before the next attempt, or None after the last one.
+
+    Exponential with equal jitter (50–100% of base * 2^attempt) so workers
+    hitting the same rate limit spread out instead of retrying in lockstep.
+    A rate-limit response's Retry-After header is honoured as a lower bound.
+    Capped at _MAX_RETRY_DELAY.
+    """
+    if attempt >= call.max_retries:
+        return None
+    delay = random.uniform(0.5, 1.0) * call.base_delay * (2 ** attempt)
+    if isinstance(error, anthropic.RateLimitError):
+        retry_after = _retry_after_seconds(error)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+    delay = min(delay, _MAX_RETRY_DELAY)
+    logger.debug("Retrying in %.1f seconds...", delay)
+    return delay
+
+
+def _retry_after_seconds(error: anthropic.APIStatusError) -> float | None:
+    """Numeric Retry-After header of an API error response, if present."""
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Shared API client (keeps the HTTP connection pool warm between documents)
+# ---------------------------------------------------------------------------
+
+_client: anthropic.Anthropic | None = None
+_client_key: str | None = None
+_client_lock = threading.Lock()
+
+
+def _client_options() -> dict[str, Any]:
+    """
+    Client settings shared by the sync and async paths.
+    SDK retries are disabled because the nodes apply their own backoff.
+    """
+    return {
+        "max_retries": 0,
+        "timeout": float(os.environ.get("LLM_TIMEOUT", _DEFAULT_TIMEOUT)),
+    }
 
+
+def _get_client(api_key: str) -> anthropic.Anthropic:
+    """Return the shared sync client, rebuilding it if the API key changed."""
+    global _client, _client_key
+    with _client_lock:
+        if _client is None or _client_key != api_key:
+            _client = anthropic.Anthropic(api_key=api_key, **_client_options())
+            _client_key = api_key
+        return _client
+
+
+def llm_fallback_node(state: dict[str, Any]) -> dict[str, Any]:
+    """
+    LangGraph node: semantic inference when keyword engine is insufficient.
+
+    Input state keys:  parsed_markdown, llm_escalation_reason,
+                       document_category, classification_confidence
+    Output state keys: document_category, classification_method ('llm_fallback'),
+                       classification_confidence, llm_unavailable
+    """
+    call = _prepare_call(state)
+    if call is None:
+        return {"llm_unavailable": True}
+
+    client = _get_client(call.api_key)
     last_error: Exception | None = None
 
-    for attempt in range(max_retries + 1):
+    for attempt in range(call.max_retries + 1):
         try:
-            response = client.messages.create(
-                model=model,
-                max_tokens=150,
-                system=_SYSTEM_PROMPT,
-                messages=[{"role": "user", "content": user_prompt}],
+            response = client.messages.create(**_request_kwargs(call))
+            output, last_error = _result_from_response(response, call, attempt)
+            if output is not None:
+                return output
+
+        except _RETRYABLE_ERRORS as exc:
+            last_error = exc
+            logger.warning(
+                "LLM API error on attempt %d/%d: %s",
+                attempt + 1, call.max_retries + 1, exc,
             )
 
-            response_text = response.content[0].text
-            parsed = _parse_llm_response(response_text, valid_categories)
+        delay = _retry_delay(call, attempt, last_error)
+        if delay:  # None after the last attempt; 0 when LLM_RETRY_BASE_DELAY=0
+            sleep(delay)
 
-            if parsed is not None:
-                logger.info(
-                    "LLM classified as '%s' (confidence=%.4f) on attempt %d",
-                    parsed["category"], parsed["confidence"], attempt + 1,
-                )
-                return {
-                    "document_category": parsed["category"],
-                    "classification_method": "llm_fallback",
-                    "classification_confidence": parsed["confidence"],
-                    "llm_unavailable": False,
-                }
-
-            # Invalid response — treat as failure, retry
-            logger.warning("LLM response could not be parsed (attempt %d)", attempt + 1)
-            last_error = ValueError(f"Unparseable LLM response: {response_text[:200]}")
-
-        except (
-            anthropic.APIError,
-            anthropic.APIConnectionError,
-            anthropic.RateLimitError,
-        ) as exc:
+    # All retries exhausted
+    logger.error("LLM fallback failed after %d attempts: %s", call.max_retries + 1, last_error)
+    return {"llm_unavailable": True}
+
+
+class _RateLimiter:
+    """
+    Token bucket admitting `rpm` requests per minute.
+
+    Holds at most one second's worth of tokens, so a burst of concurrent
+    documents is spread out instead of spending the whole minute at once.
+    """
+
+    def __init__(self, rpm: int) -> None:
+        self._rate = rpm / 60.0
+        self._capacity = max(1.0, self._rate)
+        self._tokens = self._capacity
+        self._updated = monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) / self._rate)
+
+
+async def llm_fallback_node_async(
+    state: dict[str, Any],
+    client: anthropic.AsyncAnthropic | None = None,
+    limiter: _RateLimiter | None = None,
+) -> dict[str, Any]:
+    """
+    Async twin of llm_fallback_node, for batch fan-out via llm_fallback_gather.
+
+    The compiled graph wires the sync node; graph.ainvoke() runs it in a
+    worker thread. Same inputs, outputs and retry policy, but the request
+    and the backoff are awaited, so concurrent documents overlap their
+    network latency. Pass a shared AsyncAnthropic client to reuse its
+    connection pool, and a shared limiter to count every attempt, retries
+    included, against LLM_RPM. Without one, a client is opened for this
+    call and closed before returning.
+    """
+    call = _prepare_call(state)
+    if call is None:
+        return {"llm_unavailable": True}
+
+    if client is not None:
+        return await _call_async(call, client, limiter)
+    async with anthropic.AsyncAnthropic(api_key=call.api_key, **_client_options()) as owned:
+        return await _call_async(call, owned, limiter)
+
+
+async def _call_async(
+    call: _LlmCall,
+    client: anthropic.AsyncAnthropic,
+    limiter: _RateLimiter | None,
+) -> dict[str, Any]:
+    """Retry loop behind llm_fallback_node_async."""
+    last_error: Exception | None = None
+
+    for attempt in range(call.max_retries + 1):
+        try:
+            if limiter is not None:
+                await limiter.acquire()
+            response = await client.messages.create(**_request_kwargs(call))
+            output, last_error = _result_from_response(response, call, attempt)
+            if output is not None:
+                return output
+
+        except _RETRYABLE_ERRORS as exc:
             last_error = exc
             logger.warning(
                 "LLM API error on attempt %d/%d: %s",
-                attempt + 1, max_retries + 1, exc,
+                attempt + 1, call.max_retries + 1, exc,
             )
 
-        # Exponential backoff before retry (skip on last attempt)
-        if attempt < max_retries:
-            delay = base_delay * (2 ** attempt)
-            logger.debug("Retrying in %.1f seconds...", delay)
-            time.sleep(delay)
+        delay = _retry_delay(call, attempt, last_error)
+        if delay:
+            await asyncio.sleep(delay)
 
     # All retries exhausted
-    logger.error("LLM fallback failed after %d attempts: %s", max_retries + 1, last_error)
+    logger.error("LLM fallback failed after %d attempts: %s", call.max_retries + 1, last_error)
     return {"llm_unavailable": True}
+
+
+async def llm_fallback_gather(
+    states: list[dict[str, Any]],
+    concurrency: int | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Run the LLM fallback for many documents concurrently.
+
+    At most `concurrency` requests (default LLM_CONCURRENCY, 8) are in flight
+    at once; all share one AsyncAnthropic client. When LLM_RPM is set, request
+    starts are also paced to that many per minute. Results keep input order.
+    """
+    if not states:
+        return []
+    limit = concurrency or int(os.environ.get("LLM_CONCURRENCY", _DEFAULT_CONCURRENCY))
+    semaphore = asyncio.Semaphore(limit)
+    rpm = int(os.environ.get("LLM_RPM", "0") or 0)
+    limiter = _RateLimiter(rpm) if rpm > 0 else None
+
+    api_key = os.environ.get("ANTHROPIC_API_KEY", "").strip()
+    client = anthropic.AsyncAnthropic(api_key=api_key, **_client_options()) if api_key else None
+
+    async def _one(state: dict[str, Any]) -> dict[str, Any]:
+        async with semaphore:
+            return await llm_fallback_node_async(state, client, limiter)
+
+    try:
+        return list(await asyncio.gather(*(_one(s) for s in states)))
+    finally:
+        if client is not None:
+            await client.close()
+
+
+def llm_fallback_batch(
+    states: list[dict[str, Any]],
+    poll_interval: float | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Classify many escalated documents through the Message Batches API.
+
+    Builds the same request as llm_fallback_node for each state, submits them
+    as one batch, polls until processing has ended (first after
+    LLM_BATCH_POLL_INTERVAL seconds, default 10, doubling per poll up to five
+    minutes), then maps each result back. There is no retry:
+    documents whose request errored, expired or returned an unusable answer
+    come back with llm_unavailable=True. Output order matches states.
+    """
+    if not states:
+        return []
+
+    calls = [_prepare_call(state) for state in states]
+    outputs: list[dict[str, Any]] = [{"llm_unavailable": True} for _ in states]
+    pending = {f"doc-{i}": (i, call) for i, call in enumerate(calls) if call is not None}
+    if not pending:
+        return outputs
+
+    interval = poll_interval if poll_interval is not None else float(
+        os.environ.get("LLM_BATCH_POLL_INTERVAL", _DEFAULT_BATCH_POLL_INTERVAL)
+    )
+    first_call = next(iter(pending.values()))[1]
+    client = _get_client(first_call.api_key)
+
+    try:
+        batch = client.messages.batches.create(
+            requests=[
+                {"custom_id": custom_id, "params": _request_kwargs(call)}
+                for custom_id, (_, call) in pending.items()
+            ],
+        )
+        logger.info("Submitted LLM batch %s with %d requests", batch.id, len(pending))
+
+        while batch.processing_status != "ended":
+            sleep(interval)
+            batch = client.messages.batches.retrieve(batch.id)
+            interval = min(interval * 2, _MAX_BATCH_POLL_INTERVAL)
+
+        for entry in client.messages.batches.results(batch.id):
+            index, call = pending[entry.custom_id]
+            if entry.result.type != "succeeded":
+                logger.warning(
+                    "LLM batch request %s did not succeed: %s", entry.custom_id, entry.result.type,
+                )
+                continue
+            output, _ = _result_from_response(entry.result.message, call, 0)
+            if output is not None:
+                outputs[index] = output
+
+    except _RETRYABLE_ERRORS as exc:
+        logger.error("LLM batch failed: %s", exc)
+
+    return outputs
+
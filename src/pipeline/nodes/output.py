@@ -24,26 +24,26 @@ def output_node(state: dict[str, Any]) -> dict[str, Any]:
     Input state keys:  all upstream fields + start_time_ms
     Output state keys: final_output, processing_duration_ms
     """
-    start_time_ms = state.get("start_time_ms", 0)
-    now_ms = int(time.time() * 1000)
-    duration_ms = max(0, now_ms - start_time_ms) if start_time_ms else 0
+    get = state.get  # bound once; read for every output field below
+    start_time_ms = get("start_time_ms", 0)
+    duration_ms = _duration_ms(start_time_ms) if start_time_ms else 0
 
-    if state.get("pipeline_error"):
+    if get("pipeline_error"):
         logger.warning("Pipeline failed: %s", state["pipeline_error"])
         return {"final_output": None, "processing_duration_ms": duration_ms}
 
     final_output: dict[str, Any] = {
-        "document_id": state.get("document_id", ""),
-        "source_filename": state.get("source_filename", ""),
-        "document_category": state.get("document_category", "unclassified"),
-        "classification_method": state.get("classification_method", "unclassified"),
-        "classification_confidence": state.get("classification_confidence", 0.0),
-        "matched_keywords": state.get("matched_keywords", []),
-        "llm_escalation_reason": state.get("llm_escalation_reason"),
-        "llm_unavailable": state.get("llm_unavailable", False),
-        "extracted_fields": state.get("extracted_fields", {}),
-        "validation_status": state.get("validation_status", "valid"),
-        "validation_errors": state.get("validation_errors", []),
+        "document_id": get("document_id", ""),
+        "source_filename": get("source_filename", ""),
+        "document_category": get("document_category", "unclassified"),
+        "classification_method": get("classification_method", "unclassified"),
+        "classification_confidence": get("classification_confidence", 0.0),
+        "matched_keywords": get("matched_keywords", []),
+        "llm_escalation_reason": get("llm_escalation_reason"),
+        "llm_unavailable": get("llm_unavailable", False),
+        "extracted_fields": get("extracted_fields", {}),
+        "validation_status": get("validation_status", "valid"),
+        "validation_errors": get("validation_errors", []),
         "processing_duration_ms": duration_ms,
     }
 
@@ -56,3 +56,22 @@ def output_node(state: dict[str, Any]) -> dict[str, Any]:
     )
 
     return {"final_output": final_output, "processing_duration_ms": duration_ms}
+
+
+def _duration_ms(start_time_ms: int) -> int:
+    """
+    Milliseconds elapsed since start_time_ms, a monotonic clock reading.
+
+    A monotonic start can never lie in the future, so a larger value is an
+    epoch (wall-clock) timestamp from an outdated caller: it is measured
+    against time.time() instead, with a warning, rather than misreported.
+    """
+    now_ms = time.monotonic_ns() // 1_000_000
+    if start_time_ms <= now_ms:
+        return now_ms - start_time_ms
+    logger.warning(
+        "start_time_ms=%d looks like a wall-clock timestamp; "
+        "build it from time.monotonic_ns() // 1_000_000",
+        start_time_ms,
+    )
+    return max(0, time.time_ns() // 1_000_000 - start_time_ms)
@@ -12,9 +12,15 @@ loads ONNX models). All subsequent calls reuse the same converter instance.
 
 from __future__ import annotations
 
+import atexit
 import logging
+import mmap
+import multiprocessing
 import os
+import queue
 import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
 from pathlib import Path
 from typing import Any, Optional
@@ -32,9 +38,7 @@ from docling.datamodel.base_models import ConversionStatus, DocumentStream, Inpu
 from docling.datamodel.pipeline_options import PdfPipelineOptions, RapidOcrOptions
 from docling.document_converter import DocumentConverter, PdfFormatOption
 
-import filetype
-
-from src.metadata.extractor import extract_metadata
+from src.metadata.extractor import SNIFF_BYTES, extract_metadata, sniff_mime
 
 logger = logging.getLogger(__name__)
 
@@ -62,7 +66,7 @@ SUPPORTED_MIME_TYPES: frozenset[str] = frozenset({
 })
 
 
-def _validate_file(filename: str, file_bytes: bytes) -> Optional[str]:
+def _validate_file(filename: str, file_bytes: bytes | mmap.mmap) -> Optional[str]:
     """
     Validate file extension and content type before parsing.
 
@@ -81,8 +85,9 @@ def _validate_file(filename: str, file_bytes: bytes) -> Optional[str]:
         return None
 
     # Layer 3: Unknown extension — inspect content via magic bytes
-    kind = filetype.guess(file_bytes)
-    if kind is None:
+    # (common signatures first, filetype's full matcher list as fallback)
+    detected_mime = sniff_mime(file_bytes[:SNIFF_BYTES], ext)
+    if detected_mime is None:
         logger.warning(
             "Unknown file type for '%s': no MIME type detected from content", filename,
         )
@@ -91,7 +96,6 @@ def _validate_file(filename: str, file_bytes: bytes) -> Optional[str]:
             f"and content type could not be determined"
         )
 
-    detected_mime = kind.mime
     if detected_mime in SUPPORTED_MIME_TYPES:
         logger.info(
             "Unknown extension '%s' for '%s', but detected supported MIME type: %s",
@@ -111,26 +115,123 @@ def _validate_file(filename: str, file_bytes: bytes) -> Optional[str]:
 # ---------------------------------------------------------------------------
 
 _converter: Optional[DocumentConverter] = None
+_converter_lock = threading.Lock()
+# Docling does not guard concurrent convert() calls on one converter, so
+# threads in a process take turns; parse_batch scales across processes
+_convert_lock = threading.Lock()
+
+# Optional RapidOCR model overrides (e.g. int8-quantized ONNX exports);
+# unset entries keep RapidOCR's bundled FP32 models
+_OCR_MODEL_ENV: dict[str, str] = {
+    "det_model_path": "RAPIDOCR_DET_MODEL",
+    "rec_model_path": "RAPIDOCR_REC_MODEL",
+    "cls_model_path": "RAPIDOCR_CLS_MODEL",
+}
+
+
+def _ocr_options() -> RapidOcrOptions:
+    """Build RapidOcrOptions, applying any model paths set in the environment."""
+    model_paths = {
+        field: os.environ[var]
+        for field, var in _OCR_MODEL_ENV.items()
+        if os.environ.get(var)
+    }
+    if model_paths:
+        logger.info("RapidOCR using custom models: %s", model_paths)
+    return RapidOcrOptions(**model_paths)
 
 
 def _get_converter() -> DocumentConverter:
-    """Return the module-level DocumentConverter, building it on first call."""
+    """
+    Return the module-level DocumentConverter, building it on first call.
+
+    Locked so concurrent first callers (threads of the API server, or a
+    warm-up racing a request) load the models only once.
+    """
     global _converter
-    if _converter is None:
-        ocr_options = RapidOcrOptions()
-        pipeline_options = PdfPipelineOptions(
-            do_ocr=True,
-            ocr_options=ocr_options,
-        )
-        _converter = DocumentConverter(
-            format_options={
-                InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options),
-            }
-        )
-        logger.info("Docling DocumentConverter initialised (OCR=RapidOCR)")
+    if _converter is not None:
+        return _converter
+    with _converter_lock:
+        if _converter is None:
+            ocr_options = _ocr_options()
+            # Wall-clock cap per document: Docling stops between pages and
+            # returns PARTIAL_SUCCESS, so a pathological PDF cannot hold the
+            # pipeline worker indefinitely (0 disables the cap)
+            timeout_s = float(os.environ.get("PARSE_TIMEOUT_S", 120)) or None
+            pipeline_options = PdfPipelineOptions(
+                do_ocr=True,
+                ocr_options=ocr_options,
+                document_timeout=timeout_s,
+            )
+            _converter = DocumentConverter(
+                format_options={
+                    InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options),
+                }
+            )
+            logger.info("Docling DocumentConverter initialised (OCR=RapidOCR)")
     return _converter
 
 
+def warm_up() -> None:
+    """
+    Build the converter and load its PDF pipeline models now.
+
+    Docling otherwise initialises the layout/table/OCR models on the first
+    convert(); call this at service start (or once per test session) to
+    move that multi-second cost off the first document.
+    """
+    _get_converter().initialize_pipeline(InputFormat.PDF)
+
+
+# ---------------------------------------------------------------------------
+# Process pool for batch parsing (each worker owns a converter)
+# ---------------------------------------------------------------------------
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker() -> None:
+    """Pool initializer: load the Docling/RapidOCR models once per worker."""
+    _get_converter()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """
+    Return the module-level parse pool, starting it on first call.
+
+    Workers are spawned rather than forked (ONNX Runtime is not fork-safe)
+    and default to half the logical CPUs, i.e. roughly one per physical
+    core; override with PARSE_WORKERS.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = int(os.environ.get("PARSE_WORKERS", 0)) or max(1, (os.cpu_count() or 2) // 2)
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+            atexit.register(_pool.shutdown)
+            logger.info("Parse pool started with %d workers", workers)
+        return _pool
+
+
+def parse_batch(states: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Run parse_node over many documents in parallel worker processes.
+
+    OCR and layout analysis are CPU-bound, so a process pool scales where
+    threads sharing one converter cannot. Returns parse_node outputs in
+    input order. Each state is pickled to its worker, so prefer states
+    carrying source_path over large in-memory file_bytes.
+    """
+    if not states:
+        return []
+    return list(_get_pool().map(parse_node, states, chunksize=1))
+
+
 # ---------------------------------------------------------------------------
 # Pipeline node
 # ---------------------------------------------------------------------------
@@ -142,6 +243,7 @@ def parse_node(state: dict[str, Any]) -> dict[str, Any]:
     Input state keys:
         source_filename  — original filename (used for format detection)
         file_bytes       — raw document bytes
+        source_path      — path on disk; used in place of file_bytes when absent
 
     Output state keys:
         parsed_markdown  — Markdown string (on success / partial success)
@@ -152,17 +254,46 @@ def parse_node(state: dict[str, Any]) -> dict[str, Any]:
     """
     file_bytes: bytes = state.get("file_bytes", b"")
     filename: str = state.get("source_filename", "unknown")
+    source_path = state.get("source_path")
+
+    # Callers with the file on disk may pass only source_path. The file is
+    # then memory-mapped for validation and metadata, and Docling opens the
+    # path itself, so the document is never copied onto the Python heap
+    if not file_bytes and source_path:
+        try:
+            with open(source_path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return {"parse_error": f"No file bytes provided for '{filename}'"}
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as exc:
+            logger.error("Could not read '%s': %s", source_path, exc)
+            return {"parse_error": f"Could not read '{source_path}': {exc}"}
+        with mapped:
+            return _parse_document(state, mapped, filename, source_path, Path(source_path))
 
     if not file_bytes:
         return {"parse_error": f"No file bytes provided for '{filename}'"}
 
+    return _parse_document(
+        state, file_bytes, filename, source_path,
+        DocumentStream(name=filename, stream=BytesIO(file_bytes)),
+    )
+
+
+def _parse_document(
+    state: dict[str, Any],
+    file_bytes: bytes | mmap.mmap,
+    filename: str,
+    source_path: Optional[str],
+    source: Path | DocumentStream,
+) -> dict[str, Any]:
+    """Validate, extract metadata and convert one document (see parse_node)."""
     # File validation guard — block dangerous extensions and unknown types
     validation_error = _validate_file(filename, file_bytes)
     if validation_error:
         return {"parse_error": validation_error}
 
     # Extract document metadata (filesystem + internal properties)
-    source_path = state.get("source_path")
     try:
         metadata = extract_metadata(file_bytes, filename, source_path)
         metadata_dict = metadata.model_dump(mode="json")
@@ -173,41 +304,30 @@ def parse_node(state: dict[str, Any]) -> dict[str, Any]:
     try:
         converter = _get_converter()
 
-        source = DocumentStream(name=filename, stream=BytesIO(file_bytes))
+        with _convert_lock:
+            result = converter.convert(source, raises_on_error=False)
+        status = result.status
 
-        result = converter.convert(source, raises_on_error=False)
-
-        if result.status == ConversionStatus.SUCCESS:
+        if status is ConversionStatus.SUCCESS or status is ConversionStatus.PARTIAL_SUCCESS:
             markdown = result.document.export_to_markdown()
-            logger.info("Parsed '%s' successfully (%d chars)", filename, len(markdown))
-            output: dict[str, Any] = {
-                "parsed_markdown": markdown,
-                "document_metadata": metadata_dict,
-            }
+            if status is ConversionStatus.SUCCESS:
+                logger.info("Parsed '%s' successfully (%d chars)", filename, len(markdown))
+            else:
+                warnings = [e.error_message for e in result.errors]
+                logger.warning(
+                    "Partial conversion for '%s' (%d chars, %d warnings): %s",
+                    filename, len(markdown), len(warnings), warnings,
+                )
 
             # Optionally persist Markdown to disk for debugging
             if os.environ.get("DEBUG_PERSIST_MARKDOWN", "").lower() == "true":
                 _persist_markdown(state.get("document_id", "unknown"), markdown)
 
-            return output
-
-        elif result.status == ConversionStatus.PARTIAL_SUCCESS:
-            markdown = result.document.export_to_markdown()
-            warnings = [e.error_message for e in result.errors]
-            logger.warning(
-                "Partial conversion for '%s' (%d chars, %d warnings): %s",
-                filename, len(markdown), len(warnings), warnings,
-            )
-            output = {
+            return {
                 "parsed_markdown": markdown,
                 "document_metadata": metadata_dict,
             }
 
-            if os.environ.get("DEBUG_PERSIST_MARKDOWN", "").lower() == "true":
-                _persist_markdown(state.get("document_id", "unknown"), markdown)
-
-            return output
-
         else:
             # FAILURE or SKIPPED
             error_msgs = "; ".join(e.error_message for e in result.errors) or "Unknown conversion error"
@@ -226,11 +346,60 @@ def parse_node(state: dict[str, Any]) -> dict[str, Any]:
 
 
 # ---------------------------------------------------------------------------
-# Debug helper
+# Debug helper (background writer; started on first use)
 # ---------------------------------------------------------------------------
 
+_md_queue: Optional[queue.Queue[tuple[str, str]]] = None
+_md_lock = threading.Lock()
+_md_dropped = 0
+
+
+def _md_writer_loop(q: queue.Queue[tuple[str, str]]) -> None:
+    """Drain queued (document_id, markdown) pairs to data/output/."""
+    while True:
+        document_id, markdown = q.get()
+        try:
+            _write_markdown(document_id, markdown)
+        finally:
+            q.task_done()
+
+
+def _get_md_queue() -> queue.Queue[tuple[str, str]]:
+    """Return the debug Markdown queue, starting its writer thread on first call."""
+    global _md_queue
+    if _md_queue is None:
+        with _md_lock:
+            if _md_queue is None:
+                q: queue.Queue[tuple[str, str]] = queue.Queue(maxsize=256)
+                threading.Thread(
+                    target=_md_writer_loop, args=(q,), name="markdown-writer", daemon=True,
+                ).start()
+                atexit.register(q.join)
+                _md_queue = q
+    return _md_queue
+
+
+def flush_markdown() -> None:
+    """Wait for all queued debug Markdown files to be written."""
+    if _md_queue is not None:
+        _md_queue.join()
+
+
 def _persist_markdown(document_id: str, markdown: str) -> None:
-    """Write parsed Markdown to data/output/<document_id>.md when DEBUG_PERSIST_MARKDOWN=true."""
+    """Queue parsed Markdown for data/output/<document_id>.md when DEBUG_PERSIST_MARKDOWN=true."""
+    global _md_dropped
+    try:
+        _get_md_queue().put_nowait((document_id, markdown))
+    except queue.Full:
+        _md_dropped += 1
+        logger.warning(
+            "Debug Markdown queue full; dropped '%s' (%d dropped so far)",
+            document_id, _md_dropped,
+        )
+
+
+def _write_markdown(document_id: str, markdown: str) -> None:
+    """Write one Markdown file; failures are logged, never raised."""
     try:
         output_dir = Path("data/output")
         output_dir.mkdir(parents=True, exist_ok=True)
@@ -10,8 +10,7 @@ only the keys it modified — LangGraph merges these automatically.
 
 from __future__ import annotations
 
-from typing import Any, Literal, Optional
-from typing_extensions import TypedDict
+from typing import Any, Literal, Optional, TypedDict
 
 
 class PipelineState(TypedDict, total=False):
@@ -30,13 +29,15 @@ class PipelineState(TypedDict, total=False):
     """Original filename of the document being processed."""
 
     file_bytes: bytes
-    """Raw document bytes. Passed to the Docling parse node."""
+    """Raw document bytes. Passed to the Docling parse node.
+    May be omitted when source_path is set; parse reads the file instead."""
 
     document_id: str
     """Unique ID assigned at pipeline entry. Propagated to all outputs."""
 
     start_time_ms: int
-    """Unix timestamp in ms when the pipeline was invoked. Used for duration calc."""
+    """Monotonic clock reading in ms (time.monotonic_ns() // 1_000_000) when the
+    pipeline was invoked. Used for duration calc only — not a wall-clock time."""
 
     # ------------------------------------------------------------------
     # Pre-parse: document metadata
@@ -3,7 +3,8 @@ Directory Watcher — Watchdog Integration
 Pre-Sprint 3 — Client Requirement
 
 Monitors a directory (default: data/input/) for new document files.
-When a file is created (or moved in), it fires a callback with the file path.
+When a file is created (or moved in), it fires a callback with the file path
+once the file has stopped changing (see the `latency` argument).
 
 Usage:
     from src.watcher import DirectoryWatcher
@@ -14,20 +15,33 @@ Usage:
     watcher = DirectoryWatcher("data/input", callback=on_new_document)
     watcher.start()   # non-blocking (runs in background thread)
     # ... later ...
-    watcher.stop()
+    watcher.stop()    # stops the observer thread
 
-The watcher is sync-only (Sprint 5 will add async if needed with FastAPI).
+Several watchers can share one Observer thread (pass `observer=`), and
+AsyncDirectoryWatcher exposes detected paths as an async stream for the
+FastAPI layer.
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
+import threading
+import time
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Any, AsyncIterator, Callable, Optional
 
-from watchdog.events import FileCreatedEvent, FileMovedEvent, FileSystemEventHandler
+from watchdog.events import (
+    EVENT_TYPE_CREATED,
+    EVENT_TYPE_MOVED,
+    FileCreatedEvent,
+    FileMovedEvent,
+    FileSystemEvent,
+    FileSystemEventHandler,
+)
 from watchdog.observers import Observer
+from watchdog.observers.api import BaseObserver, ObservedWatch
 
 logger = logging.getLogger(__name__)
 
@@ -36,13 +50,75 @@ WATCHED_EXTENSIONS: frozenset[str] = frozenset({
     ".pdf", ".docx", ".pptx", ".png", ".jpg", ".jpeg", ".tiff", ".tif",
 })
 
+_EXT_TUPLE: tuple[str, ...] = tuple(WATCHED_EXTENSIONS)
+
+# Only these event types can announce a new document; the rest (modified,
+# opened, closed, deleted) are dropped before any per-event work
+_HANDLED_EVENT_TYPES: frozenset[str] = frozenset({EVENT_TYPE_CREATED, EVENT_TYPE_MOVED})
+_EVENT_FILTER: list[type[FileSystemEvent]] = [FileCreatedEvent, FileMovedEvent]
+
+# Bookkeeping for shared observers, guarded by _shared_lock:
+# (observer, watch) -> number of watchers with a handler on that watch, so
+# the emitter is unscheduled only when the last of them stops; and each
+# shared observer whose thread has exited -> the observer replacing it
+_shared_lock = threading.Lock()
+_watch_handlers: dict[tuple[BaseObserver, ObservedWatch], int] = {}
+_replacements: dict[BaseObserver, BaseObserver] = {}
+
+
+def _usable_observer(observer: BaseObserver) -> BaseObserver:
+    """
+    Return `observer`, or a fresh daemon Observer if its thread has already
+    run and exited (a thread cannot be started twice). Every watcher sharing
+    the dead observer gets the same replacement. Call with _shared_lock held.
+    """
+    while observer in _replacements:
+        observer = _replacements[observer]
+    if observer.ident is None or observer.is_alive():
+        return observer
+    fresh = Observer()
+    fresh.daemon = True
+    _replacements[observer] = fresh
+    return fresh
+
 
 class _DocumentHandler(FileSystemEventHandler):
-    """Watchdog event handler that filters for supported document types."""
+    """
+    Watchdog event handler that filters for supported document types.
 
-    def __init__(self, callback: Callable[[str], None]) -> None:
+    With latency > 0, events are coalesced per path: a document is reported
+    once it has had no new events for `latency` seconds and its size is
+    unchanged across two consecutive polls. Repeated create/move events for
+    one file therefore trigger a single callback, and files still being
+    written (which emit no further subscribed events) are not handed to
+    the pipeline half-finished.
+    """
+
+    def __init__(self, callback: Callable[[str], None], latency: float = 0.0) -> None:
         super().__init__()
         self._callback = callback
+        self._latency = latency
+        # path -> (last event time, size at the previous poll or None)
+        self._pending: dict[str, tuple[float, Optional[int]]] = {}
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        if latency > 0:
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="watcher-flush", daemon=True,
+            )
+            self._flusher.start()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop the flusher thread; pending paths are discarded."""
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join(timeout=timeout)
+
+    def dispatch(self, event: FileSystemEvent) -> None:
+        if event.event_type not in _HANDLED_EVENT_TYPES or event.is_directory:
+            return
+        super().dispatch(event)
 
     def on_created(self, event: FileCreatedEvent) -> None:  # type: ignore[override]
         if event.is_directory:
@@ -55,10 +131,46 @@ class _DocumentHandler(FileSystemEventHandler):
         self._handle(event.dest_path)
 
     def _handle(self, path: str) -> None:
-        ext = Path(path).suffix.lower()
-        if ext not in WATCHED_EXTENSIONS:
+        # One C-level endswith over a tuple instead of Path(path).suffix:
+        # this runs for every create/move in the directory
+        if not path.lower().endswith(_EXT_TUPLE):
             logger.debug("Ignoring file with unsupported extension: %s", path)
             return
+        if self._flusher is None:
+            self._fire(path)
+            return
+        with self._lock:
+            self._pending[path] = (time.monotonic(), None)
+
+    def _flush_loop(self) -> None:
+        """Report pending paths once they are quiet and their size is stable."""
+        while not self._closed.wait(self._latency):
+            cutoff = time.monotonic() - self._latency
+            with self._lock:
+                due = [(p, entry) for p, entry in self._pending.items() if entry[0] <= cutoff]
+
+            ready: list[str] = []
+            for path, (seen, prev_size) in due:
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    size = -1  # gone (renamed away or deleted) — drop below
+                with self._lock:
+                    entry = self._pending.get(path)
+                    if entry is None or entry[0] != seen:
+                        continue  # a newer event arrived meanwhile
+                    if size < 0:
+                        del self._pending[path]
+                    elif size == prev_size:
+                        del self._pending[path]
+                        ready.append(path)
+                    else:
+                        self._pending[path] = (seen, size)
+
+            for path in ready:
+                self._fire(path)
+
+    def _fire(self, path: str) -> None:
         logger.info("New document detected: %s", path)
         try:
             self._callback(path)
@@ -74,6 +186,13 @@ class DirectoryWatcher:
         watch_dir: Directory path to monitor. Created if it doesn't exist.
         callback: Function called with the absolute path of each new file.
         recursive: Whether to watch subdirectories (default False).
+        latency: Seconds a file must be quiet, with a stable size, before the
+            callback fires (default 0.25). 0 reports every event immediately.
+        observer: Optional shared watchdog Observer. Several watchers (e.g.
+            one per tenant inbox) can schedule on one observer thread; it is
+            started on demand and left running when a watcher stops. If its
+            thread has already exited, start() moves the watchers sharing it
+            onto one new daemon observer.
     """
 
     def __init__(
@@ -81,11 +200,17 @@ class DirectoryWatcher:
         watch_dir: str,
         callback: Callable[[str], None],
         recursive: bool = False,
+        latency: float = 0.25,
+        observer: Optional[BaseObserver] = None,
     ) -> None:
         self._watch_dir = os.path.abspath(watch_dir)
         self._callback = callback
         self._recursive = recursive
-        self._observer: Optional[Observer] = None
+        self._latency = latency
+        self._shared_observer = observer
+        self._observer: Optional[BaseObserver] = None
+        self._watch: Optional[ObservedWatch] = None
+        self._handler: Optional[_DocumentHandler] = None
 
         # Ensure the watch directory exists
         Path(self._watch_dir).mkdir(parents=True, exist_ok=True)
@@ -97,8 +222,8 @@ class DirectoryWatcher:
 
     @property
     def is_running(self) -> bool:
-        """True if the observer thread is alive."""
-        return self._observer is not None and self._observer.is_alive()
+        """True if this watcher is scheduled and its observer thread is alive."""
+        return self._watch is not None and self._observer is not None and self._observer.is_alive()
 
     def start(self) -> None:
         """Start watching in a background thread. Idempotent — safe to call twice."""
@@ -106,20 +231,129 @@ class DirectoryWatcher:
             logger.warning("Watcher already running for %s", self._watch_dir)
             return
 
-        handler = _DocumentHandler(self._callback)
-        self._observer = Observer()
-        self._observer.schedule(handler, self._watch_dir, recursive=self._recursive)
-        self._observer.daemon = True
-        self._observer.start()
+        handler = self._handler = _DocumentHandler(self._callback, self._latency)
+        if self._shared_observer is not None:
+            with _shared_lock:
+                observer = self._observer = _usable_observer(self._shared_observer)
+                self._watch = self._schedule(observer, handler)
+                key = (observer, self._watch)
+                _watch_handlers[key] = _watch_handlers.get(key, 0) + 1
+                if not observer.is_alive():
+                    observer.start()
+        else:
+            if self._observer is None or not self._observer.is_alive():
+                # An owned observer kept by stop(keep_observer=True) is reused
+                self._observer = Observer()
+                self._observer.daemon = True
+            self._watch = self._schedule(self._observer, handler)
+            if not self._observer.is_alive():
+                self._observer.start()
         logger.info(
             "Started watching '%s' (recursive=%s)", self._watch_dir, self._recursive,
         )
 
+    def _schedule(self, observer: BaseObserver, handler: _DocumentHandler) -> ObservedWatch:
+        # event_filter narrows the OS subscription itself (on Linux the
+        # inotify mask becomes IN_CREATE | IN_MOVE), so reads, opens and
+        # mid-write modifications never reach Python at all
+        return observer.schedule(
+            handler, self._watch_dir,
+            recursive=self._recursive,
+            event_filter=_EVENT_FILTER,
+        )
+
+    def stop(self, timeout: float = 5.0, keep_observer: bool = False) -> None:
+        """
+        Stop watching and shut down the observer thread this watcher owns.
+
+        Pass keep_observer=True to leave an owned observer running so the
+        next start() reuses its thread and inotify descriptor; a later
+        stop() without it completes the shutdown. A shared observer is
+        never stopped: only this watcher's handler is detached from it.
+        """
+        observer = self._observer
+        if self._watch is not None and observer is not None:
+            if self._shared_observer is not None:
+                # Another watcher may be using the same watch (same
+                # directory); detach only our handler and drop the emitter
+                # once nobody is left on it
+                key = (observer, self._watch)
+                with _shared_lock:
+                    remaining = _watch_handlers.pop(key, 1) - 1
+                    try:
+                        if remaining:
+                            _watch_handlers[key] = remaining
+                            observer.remove_handler_for_watch(self._handler, self._watch)
+                        else:
+                            observer.unschedule(self._watch)
+                    except (KeyError, ValueError):
+                        pass  # observer already stopped and cleared its watches
+            else:
+                try:
+                    observer.unschedule(self._watch)
+                except KeyError:
+                    pass  # observer already stopped and cleared its watches
+        if self._handler is not None:
+            self._handler.close(timeout=timeout)
+            self._handler = None
+        if self._watch is not None:
+            logger.info("Stopped watching '%s'", self._watch_dir)
+        self._watch = None
+
+        if self._shared_observer is not None:
+            self._observer = None
+        elif observer is not None and not keep_observer:
+            observer.stop()
+            observer.join(timeout=timeout)
+            self._observer = None
+
+
+class AsyncDirectoryWatcher:
+    """
+    asyncio front-end for DirectoryWatcher.
+
+    Detected paths are handed from the observer thread to the event loop
+    with call_soon_threadsafe and consumed with `async for`:
+
+        watcher = AsyncDirectoryWatcher("data/input")
+        watcher.start()            # call from inside the running loop
+        async for path in watcher.stream():
+            ...
+        watcher.stop()
+
+    Accepts the same options as DirectoryWatcher, including a shared
+    observer.
+    """
+
+    def __init__(self, watch_dir: str, **kwargs: Any) -> None:
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._watcher = DirectoryWatcher(watch_dir, callback=self._enqueue, **kwargs)
+
+    @property
+    def watch_dir(self) -> str:
+        """Absolute path of the watched directory."""
+        return self._watcher.watch_dir
+
+    @property
+    def is_running(self) -> bool:
+        """True if the underlying watcher is running."""
+        return self._watcher.is_running
+
+    def start(self) -> None:
+        """Start watching; must be called with the consuming loop running."""
+        self._loop = asyncio.get_running_loop()
+        self._watcher.start()
+
     def stop(self, timeout: float = 5.0) -> None:
-        """Stop the watcher and wait for the observer thread to finish."""
-        if self._observer is None:
-            return
-        self._observer.stop()
-        self._observer.join(timeout=timeout)
-        logger.info("Stopped watching '%s'", self._watch_dir)
-        self._observer = None
+        """Stop watching. Paths already queued can still be drained."""
+        self._watcher.stop(timeout=timeout)
+
+    async def stream(self) -> AsyncIterator[str]:
+        """Yield each new document path as it is detected."""
+        while True:
+            yield await self._queue.get()
+
+    def _enqueue(self, path: str) -> None:
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, path)
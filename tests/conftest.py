@@ -0,0 +1,62 @@
+"""
+Shared pytest fixtures.
+
+Config-derived objects are session-scoped: the YAML load, Pydantic
+validation and keyword automaton build happen once per test run, not once
+per module. Tests that need a private instance (e.g. to exercise reloads
+or caches) construct their own. Fixture documents are read once per run
+too; the bytes are immutable, so sharing them is safe.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from src.classifiers.engine import KeywordClassifier
+from src.config.loader import load_categories
+
+
+@pytest.fixture(scope="session")
+def classifier():
+    return KeywordClassifier()
+
+
+@pytest.fixture(scope="session")
+def categories():
+    return load_categories()
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "documents"
+
+
+def _load_fixture(name: str) -> bytes:
+    """Read a test fixture document as raw bytes."""
+    path = FIXTURES_DIR / name
+    assert path.exists(), f"Fixture not found: {path}"
+    return path.read_bytes()
+
+
+@pytest.fixture(scope="session")
+def invoice_bytes():
+    return _load_fixture("invoice_digital.pdf")
+
+
+@pytest.fixture(scope="session")
+def resume_bytes():
+    return _load_fixture("resume_standard.pdf")
+
+
+@pytest.fixture(scope="session")
+def contract_bytes():
+    return _load_fixture("contract_service.pdf")
+
+
+@pytest.fixture(scope="session")
+def warm_converter():
+    """Load Docling's PDF models once, before the first parse test runs."""
+    from src.pipeline.nodes.parse import warm_up
+    try:
+        warm_up()
+    except Exception:
+        # Model download/load problems surface in the parse tests themselves
+        pass
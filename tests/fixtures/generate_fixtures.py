@@ -1,5 +1,7 @@
 """Generate synthetic test PDF fixtures for the test suite."""
 
+from pathlib import Path
+
 from fpdf import FPDF
 
 
@@ -63,7 +65,7 @@ def create_invoice():
     pdf.cell(0, 7, "Please remit payment to: Acme Corp Supplies Ltd.", ln=True)
     pdf.cell(0, 7, "Bank Transfer: Chase Bank, Account: 1234567890, Routing: 021000021", ln=True)
 
-    pdf.output("tests/fixtures/documents/invoice_digital.pdf")
+    Path("tests/fixtures/documents/invoice_digital.pdf").write_bytes(pdf.output())
     print("Created invoice_digital.pdf")
 
 
@@ -119,7 +121,7 @@ def create_resume():
     pdf.cell(0, 6, "Tools: Docker, Kubernetes, Terraform, AWS, GCP", ln=True)
     pdf.cell(0, 6, "Certifications: AWS Solutions Architect, CKA", ln=True)
 
-    pdf.output("tests/fixtures/documents/resume_standard.pdf")
+    Path("tests/fixtures/documents/resume_standard.pdf").write_bytes(pdf.output())
     print("Created resume_standard.pdf")
 
 
@@ -176,7 +178,7 @@ def create_contract():
     pdf.cell(95, 6, "Authorized Signatory - Party A", ln=False)
     pdf.cell(95, 6, "Authorized Signatory - Party B", ln=True)
 
-    pdf.output("tests/fixtures/documents/contract_service.pdf")
+    Path("tests/fixtures/documents/contract_service.pdf").write_bytes(pdf.output())
     print("Created contract_service.pdf")
 
 
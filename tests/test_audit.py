@@ -21,7 +21,7 @@ from unittest.mock import patch
 
 import pytest
 
-from src.pipeline.nodes.audit import audit_node
+from src.pipeline.nodes.audit import audit_node, flush_audit_log
 from src.models.schemas import AuditEntry
 
 
@@ -276,4 +276,40 @@ class TestIOFailure:
         monkeypatch.setenv("AUDIT_LOG_PATH", str(tmp_path / "audit.jsonl"))
         with patch("builtins.open", side_effect=IOError("write error")):
             result = audit_node(_FULL_STATE)
-        assert len(result["audit_id"]) == 36  # UUID4 format
+        assert len(result["audit_id"]) == 36  # UUIDv7 format
+
+
+# ---------------------------------------------------------------------------
+# Background writer (AUDIT_ASYNC=true)
+# ---------------------------------------------------------------------------
+
+
+class TestAsyncWriter:
+    """With AUDIT_ASYNC=true entries are written by a background thread."""
+
+    def test_entries_written_after_flush(self, tmp_path, monkeypatch):
+        log_file = tmp_path / "async" / "audit.jsonl"
+        monkeypatch.setenv("AUDIT_LOG_PATH", str(log_file))
+        monkeypatch.setenv("AUDIT_ASYNC", "true")
+        ids = [audit_node(_FULL_STATE)["audit_id"] for _ in range(50)]
+        flush_audit_log()
+        lines = log_file.read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["audit_id"] for line in lines] == ids
+
+    def test_returns_written_true(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("AUDIT_LOG_PATH", str(tmp_path / "audit.jsonl"))
+        monkeypatch.setenv("AUDIT_ASYNC", "true")
+        result = audit_node(_FULL_STATE)
+        flush_audit_log()
+        assert result["audit_written"] is True
+
+    def test_fsync_opt_in_syncs_each_write(self, tmp_path, monkeypatch):
+        import src.pipeline.nodes.audit as audit_mod
+        synced = []
+        monkeypatch.setattr(audit_mod, "_datasync", synced.append)
+        monkeypatch.setenv("AUDIT_FSYNC", "true")
+        log_file = tmp_path / "audit.jsonl"
+        monkeypatch.setenv("AUDIT_LOG_PATH", str(log_file))
+        audit_node(_FULL_STATE)
+        assert len(synced) == 1
+        assert log_file.read_text(encoding="utf-8").count("\n") == 1
@@ -7,24 +7,27 @@ keyword dictionaries and returns proper ClassificationResult objects.
 Run:  PYTHONPATH=. .venv/Scripts/pytest tests/test_classifier.py -v
 """
 
-import pytest
+import json
+import os
+from pathlib import Path
+from unittest.mock import patch
 
-from src.classifiers.engine import KeywordClassifier, _EXCLUSION_PENALTY
-from src.config.loader import load_categories, CategoryConfig
+import pytest
 
+from src.classifiers.engine import KeywordClassifier, _EXCLUSION_PENALTY, _decode_matched
+from src.config.loader import CategoryConfig, KeywordIndex, get_loader
 
-# ---------------------------------------------------------------------------
-# Fixtures
-# ---------------------------------------------------------------------------
 
-@pytest.fixture(scope="module")
-def classifier():
-    return KeywordClassifier()
+# Fixtures `classifier` and `categories` are session-scoped (tests/conftest.py)
 
 
-@pytest.fixture(scope="module")
-def categories():
-    return load_categories()
+def _score_category(
+    classifier: KeywordClassifier, text_lower: str, cfg: CategoryConfig,
+) -> tuple[float, list[str]]:
+    """(confidence, matched_keywords) for one category, via classify()'s _score_all path."""
+    index = KeywordIndex({cfg.category: cfg})
+    ((_slug, _cfg, confidence, primary_bits, secondary_bits),) = classifier._score_all(text_lower, index)
+    return confidence, _decode_matched(cfg, primary_bits, secondary_bits)
 
 
 # ---------------------------------------------------------------------------
@@ -378,7 +381,7 @@ class TestScoreCategory:
     def test_invoice_primary_matches(self, classifier, categories):
         cfg = categories["invoice"]
         text = "invoice invoice number bill to due date total amount".lower()
-        confidence, matched = classifier._score_category(text, cfg)
+        confidence, matched = _score_category(classifier, text, cfg)
         assert confidence > 0
         assert "invoice" in matched
         assert "invoice number" in matched
@@ -387,7 +390,7 @@ class TestScoreCategory:
         """Below min_primary_matches → confidence must be 0.0."""
         cfg = categories["invoice"]  # min_primary_matches = 2
         text = "invoice".lower()  # only 1 primary match
-        confidence, matched = classifier._score_category(text, cfg)
+        confidence, matched = _score_category(classifier, text, cfg)
         assert confidence == 0.0
         assert matched == []
 
@@ -395,10 +398,10 @@ class TestScoreCategory:
         cfg = categories["invoice"]
         # Text with enough primary matches but also exclusion keyword
         text = "invoice invoice number bill to due date payment received".lower()
-        conf_with_exclusion, _ = classifier._score_category(text, cfg)
+        conf_with_exclusion, _ = _score_category(classifier, text, cfg)
 
         text_no_exclusion = "invoice invoice number bill to due date amount due".lower()
-        conf_without_exclusion, _ = classifier._score_category(text_no_exclusion, cfg)
+        conf_without_exclusion, _ = _score_category(classifier, text_no_exclusion, cfg)
 
         # Exclusion should reduce confidence by the penalty factor
         assert conf_with_exclusion < conf_without_exclusion
@@ -408,7 +411,7 @@ class TestScoreCategory:
 
     def test_empty_text_returns_zero(self, classifier, categories):
         cfg = categories["invoice"]
-        confidence, matched = classifier._score_category("", cfg)
+        confidence, matched = _score_category(classifier, "", cfg)
         assert confidence == 0.0
         assert matched == []
 
@@ -416,11 +419,11 @@ class TestScoreCategory:
         cfg = categories["invoice"]
         # Enough primary matches
         base_text = "invoice invoice number bill to due date total amount"
-        conf_base, _ = classifier._score_category(base_text.lower(), cfg)
+        conf_base, _ = _score_category(classifier, base_text.lower(), cfg)
 
         # Add secondary keywords
         boosted_text = base_text + " vendor supplier account number subtotal tax"
-        conf_boosted, matched_boosted = classifier._score_category(boosted_text.lower(), cfg)
+        conf_boosted, matched_boosted = _score_category(classifier, boosted_text.lower(), cfg)
 
         assert conf_boosted > conf_base
         # Secondary keywords should appear in matched list
@@ -429,10 +432,25 @@ class TestScoreCategory:
     def test_all_categories_scorable(self, classifier, categories):
         """Every category config can be scored without errors."""
         for slug, cfg in categories.items():
-            confidence, matched = classifier._score_category("random text", cfg)
+            confidence, matched = _score_category(classifier, "random text", cfg)
             assert isinstance(confidence, float)
             assert isinstance(matched, list)
 
+    @pytest.mark.parametrize("text", [
+        INVOICE_TEXT, RESUME_TEXT, CONTRACT_TEXT, PURCHASE_ORDER_TEXT,
+        BANK_STATEMENT_TEXT, RECEIPT_TEXT, REPORT_TEXT, GIBBERISH_TEXT,
+        INVOICE_TEXT + "\nPayment Received. Paid in Full.",
+    ])
+    def test_automaton_matches_substring_scan(self, classifier, categories, text):
+        """Aho-Corasick scoring must agree with the per-keyword scan exactly."""
+        if KeywordIndex(categories).automaton is None:
+            pytest.skip("pyahocorasick not installed")
+        text_lower = text.lower()
+        for slug, cfg in categories.items():
+            confidence, primary_bits, secondary_bits = classifier._score_hits_scan(text_lower, cfg)
+            assert _score_category(classifier, text_lower, cfg) == \
+                (confidence, _decode_matched(cfg, primary_bits, secondary_bits)), slug
+
 
 # ---------------------------------------------------------------------------
 # TestClassify — integration tests for classify()
@@ -440,46 +458,23 @@ class TestScoreCategory:
 
 class TestClassify:
 
-    def test_invoice_classification(self, classifier):
-        result = classifier.classify(INVOICE_TEXT)
-        assert result.category == "invoice"
+    @pytest.mark.parametrize("text, expected, min_confidence", [
+        (INVOICE_TEXT, "invoice", 0.60),
+        (RESUME_TEXT, "resume", 0.60),
+        (CONTRACT_TEXT, "contract", 0.55),
+        (PURCHASE_ORDER_TEXT, "purchase_order", 0.0),
+        (BANK_STATEMENT_TEXT, "bank_statement", 0.0),
+        (RECEIPT_TEXT, "receipt", 0.0),
+        (REPORT_TEXT, "report", 0.0),
+    ], ids=["invoice", "resume", "contract", "purchase_order", "bank_statement", "receipt", "report"])
+    def test_category_classification(self, classifier, text, expected, min_confidence):
+        result = classifier.classify(text)
+        assert result.category == expected
         assert result.method == "deterministic"
-        assert result.confidence >= 0.60
+        assert result.confidence >= min_confidence
         assert len(result.matched_keywords) > 0
         assert result.escalation_reason is None
 
-    def test_resume_classification(self, classifier):
-        result = classifier.classify(RESUME_TEXT)
-        assert result.category == "resume"
-        assert result.method == "deterministic"
-        assert result.confidence >= 0.60
-
-    def test_contract_classification(self, classifier):
-        result = classifier.classify(CONTRACT_TEXT)
-        assert result.category == "contract"
-        assert result.method == "deterministic"
-        assert result.confidence >= 0.55
-
-    def test_purchase_order_classification(self, classifier):
-        result = classifier.classify(PURCHASE_ORDER_TEXT)
-        assert result.category == "purchase_order"
-        assert result.method == "deterministic"
-
-    def test_bank_statement_classification(self, classifier):
-        result = classifier.classify(BANK_STATEMENT_TEXT)
-        assert result.category == "bank_statement"
-        assert result.method == "deterministic"
-
-    def test_receipt_classification(self, classifier):
-        result = classifier.classify(RECEIPT_TEXT)
-        assert result.category == "receipt"
-        assert result.method == "deterministic"
-
-    def test_report_classification(self, classifier):
-        result = classifier.classify(REPORT_TEXT)
-        assert result.category == "report"
-        assert result.method == "deterministic"
-
     def test_gibberish_unclassified(self, classifier):
         result = classifier.classify(GIBBERISH_TEXT)
         assert result.method == "unclassified"
@@ -501,6 +496,35 @@ class TestClassify:
         result = classifier.classify(INVOICE_TEXT)
         assert all(isinstance(kw, str) for kw in result.matched_keywords)
 
+    def test_classify_batch_matches_classify(self, classifier):
+        texts = [INVOICE_TEXT, RESUME_TEXT, GIBBERISH_TEXT, ""]
+        batch = classifier.classify_batch(texts)
+        assert [r.model_dump() for r in batch] == [
+            classifier.classify(t).model_dump() for t in texts
+        ]
+
+    def test_shared_automaton_matches_per_category_scoring(self, classifier):
+        index = get_loader().get_keyword_index()
+        text_lower = INVOICE_TEXT.lower() + " payment received"
+        shared = {
+            slug: (confidence, _decode_matched(cfg, primary_bits, secondary_bits))
+            for slug, cfg, confidence, primary_bits, secondary_bits
+            in classifier._score_all(text_lower, index)
+        }
+        per_category = {
+            slug: _score_category(classifier, text_lower, cfg)
+            for slug, cfg in index.categories.items()
+        }
+        assert shared == per_category
+
+    @pytest.mark.parametrize("text", [INVOICE_TEXT, REPORT_TEXT, GIBBERISH_TEXT])
+    def test_substring_fallback_matches_automaton(self, classifier, categories, text):
+        """The scan fallback (with early exit) picks the same result as the automaton."""
+        index = KeywordIndex(categories)
+        expected = classifier._classify_one(text, index)
+        index.automaton = None
+        assert classifier._classify_one(text, index) == expected
+
     def test_deterministic_method_has_no_escalation(self, classifier):
         result = classifier.classify(INVOICE_TEXT)
         if result.method == "deterministic":
@@ -544,6 +568,129 @@ class TestExtractFields:
             fields = classifier.extract_fields("random text with no structure", cfg)
             assert isinstance(fields, dict)
 
+    def test_re2_engine_extracts_same_fields(self, classifier, categories, monkeypatch):
+        """Opt-in RE2 compilation yields the same fields on the synthetic documents."""
+        pytest.importorskip("re2")
+        from src.config.loader import KeywordConfigLoader
+        monkeypatch.setenv("KW_REGEX_ENGINE", "re2")
+        re2_categories = KeywordConfigLoader().get_categories()
+        for text in (INVOICE_TEXT, RESUME_TEXT, CONTRACT_TEXT, RECEIPT_TEXT):
+            for slug, cfg in categories.items():
+                assert classifier.extract_fields(text, re2_categories[slug]) == \
+                    classifier.extract_fields(text, cfg), slug
+
+    def test_re2_falls_back_for_lookaround(self, monkeypatch):
+        pytest.importorskip("re2")
+        from src.config.loader import RegexPattern
+        monkeypatch.setenv("KW_REGEX_ENGINE", "re2")
+        rp = RegexPattern(pattern=r"total(?=:)\W+(\d+)")
+        assert rp.compiled.search("Total: 42").group(1) == "42"
+
+
+# ---------------------------------------------------------------------------
+# TestGolden — regression check against committed expected output
+# ---------------------------------------------------------------------------
+
+GOLDEN_PATH = Path(__file__).parent / "fixtures" / "expected" / "classifier_golden.json"
+
+GOLDEN_TEXTS = {
+    "invoice": INVOICE_TEXT,
+    "resume": RESUME_TEXT,
+    "contract": CONTRACT_TEXT,
+    "purchase_order": PURCHASE_ORDER_TEXT,
+    "bank_statement": BANK_STATEMENT_TEXT,
+    "receipt": RECEIPT_TEXT,
+    "report": REPORT_TEXT,
+    "gibberish": GIBBERISH_TEXT,
+}
+
+
+def _golden_record(classifier, categories, text: str) -> dict:
+    result = classifier.classify(text)
+    cfg = categories.get(result.category)
+    return {
+        "document_category": result.category,
+        "classification_method": result.method,
+        "confidence": result.confidence,
+        "matched_keywords": sorted(result.matched_keywords),
+        "extracted_fields": classifier.extract_fields(text, cfg) if cfg else {},
+    }
+
+
+class TestGolden:
+    """
+    Compares classifier output with tests/fixtures/expected/classifier_golden.json.
+
+    Any change in scoring, keyword config or field patterns that alters a
+    result shows up here as a diff. After an intended change, regenerate
+    with:  REGEN_GOLDEN=1 pytest tests/test_classifier.py -k golden
+    """
+
+    def test_matches_golden(self, classifier, categories):
+        actual = {
+            name: _golden_record(classifier, categories, text)
+            for name, text in GOLDEN_TEXTS.items()
+        }
+        if os.environ.get("REGEN_GOLDEN") == "1":
+            GOLDEN_PATH.parent.mkdir(parents=True, exist_ok=True)
+            GOLDEN_PATH.write_text(json.dumps(actual, indent=2) + "\n", encoding="utf-8")
+        golden = json.loads(GOLDEN_PATH.read_text(encoding="utf-8"))
+        assert actual == golden
+
+
+# ---------------------------------------------------------------------------
+# TestResultCache — memoised classify()
+# ---------------------------------------------------------------------------
+
+class TestResultCache:
+
+    def test_repeat_document_served_from_cache(self):
+        classifier = KeywordClassifier()
+        with patch.object(classifier, "_classify_one", wraps=classifier._classify_one) as score:
+            first = classifier.classify(INVOICE_TEXT)
+            assert classifier.classify(INVOICE_TEXT) == first
+        assert score.call_count == 1
+
+    def test_cached_keywords_are_not_shared(self):
+        classifier = KeywordClassifier()
+        first = classifier.classify(INVOICE_TEXT)
+        expected = list(first.matched_keywords)
+        first.matched_keywords.append("tampered")
+        assert classifier.classify(INVOICE_TEXT).matched_keywords == expected
+
+    def test_use_cache_false_rescores(self):
+        classifier = KeywordClassifier()
+        first = classifier.classify(INVOICE_TEXT)
+        with patch.object(classifier, "_classify_one", wraps=classifier._classify_one) as score:
+            second = classifier.classify(INVOICE_TEXT, use_cache=False)
+        assert score.call_count == 1
+        assert second == first
+
+    def test_reload_invalidates_cache(self):
+        from src.config.loader import KeywordConfigLoader
+        loader = KeywordConfigLoader()
+        classifier = KeywordClassifier(loader=loader)
+        first = classifier.classify(INVOICE_TEXT)
+        loader.reload_all()
+        with patch.object(classifier, "_classify_one", wraps=classifier._classify_one) as score:
+            second = classifier.classify(INVOICE_TEXT)
+        assert score.call_count == 1
+        assert second == first
+
+    def test_cache_is_bounded(self):
+        classifier = KeywordClassifier(cache_size=2)
+        for text in (INVOICE_TEXT, RESUME_TEXT, REPORT_TEXT):
+            classifier.classify(text)
+        assert len(classifier._result_cache) == 2
+
+    def test_clear_cache(self):
+        classifier = KeywordClassifier()
+        classifier.classify(INVOICE_TEXT)
+        classifier.clear_cache()
+        with patch.object(classifier, "_classify_one", wraps=classifier._classify_one) as score:
+            classifier.classify(INVOICE_TEXT)
+        assert score.call_count == 1
+
 
 # ---------------------------------------------------------------------------
 # TestEdgeCases
@@ -7,11 +7,16 @@ and that the Pydantic schemas are importable and instantiable.
 Run:  .venv/Scripts/pytest tests/test_config.py -v
 """
 
+import os
+import re
+
 import pytest
 from pathlib import Path
 
-from src.config.loader import KeywordConfigLoader, CategoryConfig, load_categories
-from src.models.schemas import ExtractedDocument, AuditEntry, ClassificationResult
+from src.config.loader import (
+    CategoryConfig, CategoryIndex, KeywordConfigLoader, RegexPattern, load_categories,
+)
+from src.models.schemas import ExtractedDocument, AuditEntry, ClassificationResult, new_id
 
 
 # ---------------------------------------------------------------------------
@@ -54,75 +59,69 @@ class TestCategoriesIndex:
         """categories.yaml marks all as enabled=true — all 7 should appear."""
         assert len(categories) == len(EXPECTED_CATEGORIES)
 
+    def test_enabled_entries_ordered_by_priority(self):
+        index = CategoryIndex(categories=[
+            {"category": "c", "file": "c.yaml", "priority": 3},
+            {"category": "a", "file": "a.yaml", "priority": 1},
+            {"category": "x", "file": "x.yaml"},
+            {"category": "b", "file": "b.yaml", "priority": 2, "enabled": False},
+        ])
+        assert [e["category"] for e in index.enabled_entries()] == ["a", "c", "x"]
+
 
 # ---------------------------------------------------------------------------
 # Per-category YAML validation
 # ---------------------------------------------------------------------------
 
 class TestCategoryConfigs:
-    @pytest.mark.parametrize("slug", sorted(EXPECTED_CATEGORIES))
-    def test_category_loads_as_pydantic_model(self, categories, slug):
-        cfg = categories[slug]
-        assert isinstance(cfg, CategoryConfig), f"{slug} did not load as CategoryConfig"
-
-    @pytest.mark.parametrize("slug", sorted(EXPECTED_CATEGORIES))
-    def test_has_primary_keywords(self, categories, slug):
-        cfg = categories[slug]
-        assert len(cfg.primary_keywords) >= 5, (
-            f"{slug}: expected >= 5 primary keywords, got {len(cfg.primary_keywords)}"
-        )
-
-    @pytest.mark.parametrize("slug", sorted(EXPECTED_CATEGORIES))
-    def test_has_secondary_keywords(self, categories, slug):
-        cfg = categories[slug]
-        assert len(cfg.secondary_keywords) >= 5, (
-            f"{slug}: expected >= 5 secondary keywords, got {len(cfg.secondary_keywords)}"
-        )
-
-    @pytest.mark.parametrize("slug", sorted(EXPECTED_CATEGORIES))
-    def test_confidence_threshold_in_valid_range(self, categories, slug):
-        cfg = categories[slug]
-        assert 0.0 < cfg.confidence_threshold < 1.0, (
-            f"{slug}: confidence_threshold must be in (0, 1), got {cfg.confidence_threshold}"
-        )
-
-    @pytest.mark.parametrize("slug", sorted(EXPECTED_CATEGORIES))
-    def test_has_mandatory_fields(self, categories, slug):
-        cfg = categories[slug]
-        assert len(cfg.mandatory_fields) >= 1, (
-            f"{slug}: must define at least 1 mandatory_field"
-        )
-
-    @pytest.mark.parametrize("slug", sorted(EXPECTED_CATEGORIES))
-    def test_has_regex_patterns(self, categories, slug):
-        cfg = categories[slug]
-        assert len(cfg.regex_patterns) >= 1, (
-            f"{slug}: must define at least 1 regex_pattern"
-        )
-
-    @pytest.mark.parametrize("slug", sorted(EXPECTED_CATEGORIES))
-    def test_mandatory_fields_have_regex_patterns(self, categories, slug):
-        """Every mandatory_field should have a corresponding regex_pattern to extract it."""
-        cfg = categories[slug]
-        missing = [f for f in cfg.mandatory_fields if f not in cfg.regex_patterns]
-        assert not missing, (
-            f"{slug}: mandatory fields lack regex patterns: {missing}"
-        )
-
-    @pytest.mark.parametrize("slug", sorted(EXPECTED_CATEGORIES))
-    def test_keywords_are_lowercase(self, categories, slug):
-        """Loader normalises all keywords to lowercase."""
-        cfg = categories[slug]
-        for kw in cfg.primary_keywords + cfg.secondary_keywords:
-            assert kw == kw.lower(), f"{slug}: keyword not lowercased: '{kw}'"
-
-    @pytest.mark.parametrize("slug", sorted(EXPECTED_CATEGORIES))
-    def test_min_primary_matches_lte_primary_count(self, categories, slug):
-        cfg = categories[slug]
-        assert cfg.scoring.min_primary_matches <= len(cfg.primary_keywords), (
-            f"{slug}: min_primary_matches ({cfg.scoring.min_primary_matches}) "
-            f"> total primary keywords ({len(cfg.primary_keywords)})"
-        )
+    def test_all_categories_valid(self, categories):
+        """Every category YAML satisfies the schema rules; reports all violations at once."""
+        violations: list[str] = []
+        for slug in sorted(EXPECTED_CATEGORIES):
+            cfg = categories[slug]
+            if not isinstance(cfg, CategoryConfig):
+                violations.append(f"{slug}: did not load as CategoryConfig")
+                continue
+            if len(cfg.primary_keywords) < 5:
+                violations.append(f"{slug}: expected >= 5 primary keywords, got {len(cfg.primary_keywords)}")
+            if len(cfg.secondary_keywords) < 5:
+                violations.append(f"{slug}: expected >= 5 secondary keywords, got {len(cfg.secondary_keywords)}")
+            if not 0.0 < cfg.confidence_threshold < 1.0:
+                violations.append(f"{slug}: confidence_threshold must be in (0, 1), got {cfg.confidence_threshold}")
+            if not cfg.mandatory_fields:
+                violations.append(f"{slug}: must define at least 1 mandatory_field")
+            if not cfg.regex_patterns:
+                violations.append(f"{slug}: must define at least 1 regex_pattern")
+            for name, rp in cfg.regex_patterns.items():
+                # re.Pattern, or an re2 pattern under KW_REGEX_ENGINE=re2
+                if not callable(getattr(rp.compiled, "search", None)):
+                    violations.append(f"{slug}.{name}: pattern not precompiled")
+            # Every mandatory_field needs a regex_pattern to extract it
+            missing = [f for f in cfg.mandatory_fields if f not in cfg.regex_patterns]
+            if missing:
+                violations.append(f"{slug}: mandatory fields lack regex patterns: {missing}")
+            # Loader normalises all keywords to lowercase
+            for kw in cfg.primary_keywords + cfg.secondary_keywords:
+                if kw != kw.lower():
+                    violations.append(f"{slug}: keyword not lowercased: '{kw}'")
+            if cfg.scoring.min_primary_matches > len(cfg.primary_keywords):
+                violations.append(
+                    f"{slug}: min_primary_matches ({cfg.scoring.min_primary_matches}) "
+                    f"> total primary keywords ({len(cfg.primary_keywords)})"
+                )
+        assert violations == []
+
+    def test_derived_values_computed_at_construction(self, categories):
+        """Cached scoring inputs are filled in before the config is shared."""
+        cached = vars(categories["invoice"])
+        for name in ("_primary_tuple", "_secondary_tuple", "_exclusion_tuple",
+                     "_pw", "_sw", "_min_primary", "_max_score", "_extractors"):
+            assert name in cached, name
+
+    def test_invalid_regex_fails_at_load(self):
+        """Patterns are compiled when the config is built, not per document."""
+        with pytest.raises(re.error):
+            RegexPattern(pattern="(unclosed")
 
 
 # ---------------------------------------------------------------------------
@@ -143,6 +142,82 @@ class TestHotReload:
     def test_get_nonexistent_category_returns_none(self, loader):
         assert loader.get_category("nonexistent_xyz") is None
 
+    def test_changed_file_picked_up_after_interval(self, tmp_path):
+        _write_config(tmp_path, ["alpha", "beta"])
+        loader = KeywordConfigLoader(config_dir=tmp_path, reload_interval_s=0)
+        assert loader.get_category("sample").primary_keywords == ["alpha", "beta"]
+
+        _write_config(tmp_path, ["gamma", "delta"], mtime_offset=10)
+        assert loader.get_category("sample").primary_keywords == ["gamma", "delta"]
+
+    def test_reload_checks_debounced_within_interval(self, tmp_path):
+        _write_config(tmp_path, ["alpha", "beta"])
+        loader = KeywordConfigLoader(config_dir=tmp_path, reload_interval_s=3600)
+        loader.get_categories()
+
+        _write_config(tmp_path, ["gamma", "delta"], mtime_offset=10)
+        assert loader.get_category("sample").primary_keywords == ["alpha", "beta"]
+        assert loader.reload_all()["sample"].primary_keywords == ["gamma", "delta"]
+
+    def test_unchanged_files_return_same_snapshot(self, tmp_path):
+        _write_config(tmp_path, ["alpha", "beta"])
+        loader = KeywordConfigLoader(config_dir=tmp_path, reload_interval_s=0)
+        assert loader.get_categories() is loader.get_categories()
+
+    def test_index_change_rebuilds_snapshot(self, tmp_path):
+        _write_config(tmp_path, ["alpha", "beta"])
+        loader = KeywordConfigLoader(config_dir=tmp_path, reload_interval_s=0)
+        assert "sample" in loader.get_categories()
+
+        index = tmp_path / "categories.yaml"
+        index.write_text(index.read_text(encoding="utf-8") + "    enabled: false\n", encoding="utf-8")
+        stat = index.stat()
+        os.utime(index, (stat.st_atime, stat.st_mtime + 10))
+        assert loader.get_categories() == {}
+
+    def test_deleted_file_drops_category(self, tmp_path):
+        _write_config(tmp_path, ["alpha", "beta"])
+        loader = KeywordConfigLoader(config_dir=tmp_path, reload_interval_s=0)
+        assert "sample" in loader.get_categories()
+
+        (tmp_path / "sample.yaml").unlink()
+        assert loader.get_categories() == {}
+
+        _write_config(tmp_path, ["gamma", "delta"])
+        assert loader.get_category("sample").primary_keywords == ["gamma", "delta"]
+
+    def test_json_keyword_file_supported(self, tmp_path):
+        (tmp_path / "categories.yaml").write_text(
+            "categories:\n  - category: sample\n    file: sample.json\n", encoding="utf-8",
+        )
+        (tmp_path / "sample.json").write_text(
+            '{"category": "sample", "display_name": "Sample", "confidence_threshold": 0.5,'
+            ' "primary_keywords": ["Alpha", "beta"]}',
+            encoding="utf-8",
+        )
+        loader = KeywordConfigLoader(config_dir=tmp_path, reload_interval_s=0)
+        assert loader.get_category("sample").primary_keywords == ["alpha", "beta"]
+
+
+def _write_config(config_dir: Path, primary: list[str], mtime_offset: float = 0) -> None:
+    """Write a one-category keyword config into config_dir."""
+    (config_dir / "categories.yaml").write_text(
+        "categories:\n  - category: sample\n    file: sample.yaml\n",
+        encoding="utf-8",
+    )
+    path = config_dir / "sample.yaml"
+    path.write_text(
+        "category: sample\n"
+        "display_name: Sample\n"
+        "confidence_threshold: 0.5\n"
+        f"primary_keywords: {primary}\n",
+        encoding="utf-8",
+    )
+    if mtime_offset:
+        # Bump mtime explicitly so the change is visible on coarse-grained filesystems
+        stat = path.stat()
+        os.utime(path, (stat.st_atime, stat.st_mtime + mtime_offset))
+
 
 # ---------------------------------------------------------------------------
 # Pydantic schema imports and basic instantiation
@@ -191,6 +266,29 @@ class TestSchemas:
         assert audit.validation_outcome == "partial"
         assert audit.processing_duration_ms == 4200
 
+    def test_records_are_immutable(self):
+        from pydantic import ValidationError
+        result = ClassificationResult(category="invoice", confidence=0.8, method="deterministic")
+        with pytest.raises(ValidationError):
+            result.confidence = 0.1
+
+    def test_new_id_is_time_ordered_uuid7(self):
+        import uuid
+        ids = [new_id() for _ in range(1000)]
+        assert len(set(ids)) == len(ids)
+        parsed = uuid.UUID(ids[0])
+        assert parsed.version == 7
+        assert parsed.variant == uuid.RFC_4122
+        # The millisecond prefix never goes backwards
+        assert [i[:13] for i in ids] == sorted(i[:13] for i in ids)
+
+    def test_new_id_ignores_global_random_seed(self):
+        import random
+        random.seed(42)
+        first = new_id()
+        random.seed(42)
+        assert new_id()[14:] != first[14:]
+
     def test_confidence_rounded_to_4dp(self):
         doc = ExtractedDocument(
             source_filename="x.pdf",
@@ -9,14 +9,25 @@ Run:  PYTHONPATH=. .venv/Scripts/pytest tests/test_llm_fallback.py -v
 
 import json
 import os
-from unittest.mock import MagicMock, patch
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import anthropic
+import httpx
 import pytest
 
+from src.pipeline.nodes import llm
 from src.pipeline.nodes.llm import (
     _build_prompt,
+    _get_valid_categories,
+    _LlmCall,
+    _retry_delay,
     _parse_llm_response,
+    _system_blocks,
+    llm_fallback_batch,
+    llm_fallback_gather,
     llm_fallback_node,
+    llm_fallback_node_async,
 )
 
 
@@ -24,6 +35,21 @@ from src.pipeline.nodes.llm import (
 # Fixtures
 # ---------------------------------------------------------------------------
 
+
+@pytest.fixture(autouse=True)
+def _fresh_client():
+    """Drop the shared client so each test sees its own patched Anthropic class."""
+    llm._client = None
+    yield
+    llm._client = None
+
+
+@pytest.fixture(autouse=True)
+def _no_sleep(monkeypatch):
+    """Retry backoff and batch polling never really wait in this module."""
+    monkeypatch.setattr(llm, "sleep", lambda _seconds: None)
+
+
 VALID_CATEGORIES = ["bank_statement", "contract", "invoice", "purchase_order", "receipt", "report", "resume"]
 
 SAMPLE_STATE = {
@@ -90,6 +116,32 @@ class TestParseLlmResponse:
         result = _parse_llm_response(text, VALID_CATEGORIES)
         assert result == {"category": "contract", "confidence": 0.72}
 
+    @pytest.mark.parametrize("text", [
+        '```json\n{"category": "contract", "confidence": 0.72}\n```',
+        'Here is the classification: {"category": "contract", "confidence": 0.72}',
+    ])
+    def test_object_extracted_from_surrounding_text(self, text):
+        result = _parse_llm_response(text, VALID_CATEGORIES)
+        assert result == {"category": "contract", "confidence": 0.72}
+
+    def test_non_object_json_rejected(self):
+        assert _parse_llm_response('["invoice", 0.9]', VALID_CATEGORIES) is None
+
+    @pytest.mark.parametrize("text", [
+        '{"confidence": 0.6, "category": "invoice"}',        # key order differs
+        '{"category": "invoice", "confidence": 0.6, "x": 1}',  # extra key
+        '{"category": "invoice", "confidence": 01}',          # invalid JSON number
+        '{"category": "invoice", "confidence": 0.6',           # truncated
+    ])
+    def test_off_shape_responses_match_json_parse(self, text):
+        """Responses outside the fast-path shape get exactly the JSON parser's verdict."""
+        try:
+            data = json.loads(text)
+            expected = {"category": data["category"], "confidence": data["confidence"]}
+        except json.JSONDecodeError:
+            expected = None
+        assert _parse_llm_response(text, VALID_CATEGORIES) == expected
+
 
 # ---------------------------------------------------------------------------
 # _build_prompt tests
@@ -99,10 +151,18 @@ class TestParseLlmResponse:
 class TestBuildPrompt:
     """Tests for prompt construction."""
 
-    def test_prompt_includes_categories(self):
-        prompt = _build_prompt(SAMPLE_STATE, VALID_CATEGORIES)
+    def test_system_blocks_include_categories(self):
+        (block,) = _system_blocks(tuple(VALID_CATEGORIES))
         for cat in VALID_CATEGORIES:
-            assert cat in prompt
+            assert cat in block["text"]
+        assert block["cache_control"] == {"type": "ephemeral"}
+        assert '"confidence"' in block["text"]
+
+    def test_user_prompt_has_no_category_list(self):
+        """Categories and instructions live in the cached system prefix, not the per-document prompt."""
+        prompt = _build_prompt(SAMPLE_STATE, VALID_CATEGORIES)
+        assert "purchase_order" not in prompt
+        assert "Respond with JSON" not in prompt
 
     def test_prompt_includes_escalation_reason(self):
         prompt = _build_prompt(SAMPLE_STATE, VALID_CATEGORIES)
@@ -119,6 +179,52 @@ class TestBuildPrompt:
         assert len(prompt) < 10000
 
 
+def _call(max_retries: int = 3, base_delay: float = 1.0) -> _LlmCall:
+    return _LlmCall("k", "m", max_retries, base_delay, ("invoice",), frozenset({"invoice"}), "p")
+
+
+def _rate_limit_error(retry_after: str | None):
+    headers = {"retry-after": retry_after} if retry_after is not None else {}
+    response = httpx.Response(429, headers=headers, request=httpx.Request("POST", "https://x"))
+    return anthropic.RateLimitError("rate limited", response=response, body=None)
+
+
+class TestRetryDelay:
+    """Tests for jittered backoff and Retry-After handling."""
+
+    def test_no_delay_after_last_attempt(self):
+        assert _retry_delay(_call(max_retries=1), 1) is None
+
+    def test_jitter_within_half_to_full_backoff(self):
+        delays = {_retry_delay(_call(base_delay=1.0), 2) for _ in range(50)}
+        assert all(2.0 <= d <= 4.0 for d in delays)
+        assert len(delays) > 1
+
+    def test_retry_after_is_lower_bound(self):
+        assert _retry_delay(_call(base_delay=0.0), 0, _rate_limit_error("7")) == 7.0
+
+    def test_non_numeric_retry_after_ignored(self):
+        assert _retry_delay(_call(base_delay=0.0), 0, _rate_limit_error("soon")) == 0.0
+
+    def test_delay_capped(self):
+        assert _retry_delay(_call(base_delay=0.0), 0, _rate_limit_error("600")) == 60.0
+
+
+class TestValidCategories:
+    """Tests for the memoised category lookups."""
+
+    @patch("src.pipeline.nodes.llm.load_categories")
+    def test_reused_until_snapshot_changes(self, mock_load):
+        mock_load.return_value = {"invoice": MagicMock(), "contract": MagicMock()}
+        ordered, valid_set = _get_valid_categories()
+        assert ordered == ("contract", "invoice")
+        assert valid_set == frozenset(ordered)
+        assert _get_valid_categories()[0] is ordered
+
+        mock_load.return_value = {"resume": MagicMock()}
+        assert _get_valid_categories()[0] == ("resume",)
+
+
 # ---------------------------------------------------------------------------
 # llm_fallback_node tests
 # ---------------------------------------------------------------------------
@@ -184,9 +290,8 @@ class TestLlmFallbackNode:
         mock_client = MagicMock()
         mock_client_cls.return_value = mock_client
 
-        import anthropic as anthropic_mod
         mock_client.messages.create.side_effect = [
-            anthropic_mod.APIConnectionError(request=MagicMock()),
+            anthropic.APIConnectionError(request=MagicMock()),
             _make_mock_response('{"category": "invoice", "confidence": 0.75}'),
         ]
 
@@ -209,8 +314,7 @@ class TestLlmFallbackNode:
         mock_client = MagicMock()
         mock_client_cls.return_value = mock_client
 
-        import anthropic as anthropic_mod
-        mock_client.messages.create.side_effect = anthropic_mod.APIConnectionError(
+        mock_client.messages.create.side_effect = anthropic.APIConnectionError(
             request=MagicMock()
         )
 
@@ -275,3 +379,214 @@ class TestLlmFallbackNode:
 
         call_kwargs = mock_client.messages.create.call_args[1]
         assert call_kwargs["model"] == "claude-sonnet-4-5-20250929"
+
+    @patch("src.pipeline.nodes.llm.anthropic.Anthropic")
+    @patch("src.pipeline.nodes.llm.load_categories")
+    def test_client_reused_across_calls(self, mock_load, mock_client_cls, monkeypatch):
+        """One client (and connection pool) serves consecutive documents."""
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+        monkeypatch.setenv("LLM_MAX_RETRIES", "0")
+        mock_load.return_value = {"invoice": MagicMock()}
+        mock_client_cls.return_value.messages.create.return_value = _make_mock_response(
+            '{"category": "invoice", "confidence": 0.80}'
+        )
+
+        llm_fallback_node(SAMPLE_STATE)
+        llm_fallback_node(SAMPLE_STATE)
+        assert mock_client_cls.call_count == 1
+        assert mock_client_cls.call_args[1]["max_retries"] == 0
+
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "other-key")
+        llm_fallback_node(SAMPLE_STATE)
+        assert mock_client_cls.call_count == 2
+
+    @patch("src.pipeline.nodes.llm.anthropic.Anthropic")
+    @patch("src.pipeline.nodes.llm.load_categories")
+    def test_system_prompt_sent_with_cache_breakpoint(self, mock_load, mock_client_cls, monkeypatch):
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+        monkeypatch.setenv("LLM_MAX_RETRIES", "0")
+        mock_load.return_value = {"invoice": MagicMock(), "contract": MagicMock()}
+
+        mock_client = MagicMock()
+        mock_client_cls.return_value = mock_client
+        mock_client.messages.create.return_value = _make_mock_response(
+            '{"category": "invoice", "confidence": 0.80}'
+        )
+
+        llm_fallback_node(SAMPLE_STATE)
+
+        system = mock_client.messages.create.call_args[1]["system"]
+        assert system[-1]["cache_control"] == {"type": "ephemeral"}
+        assert "contract, invoice" in system[-1]["text"]
+
+
+# ---------------------------------------------------------------------------
+# Async variant tests
+# ---------------------------------------------------------------------------
+
+
+class TestLlmFallbackAsync:
+    """Tests for llm_fallback_node_async and llm_fallback_gather."""
+
+    async def test_no_api_key_returns_unavailable(self, monkeypatch):
+        monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+        result = await llm_fallback_node_async(SAMPLE_STATE)
+        assert result["llm_unavailable"] is True
+
+    @patch("src.pipeline.nodes.llm.anthropic.AsyncAnthropic")
+    @patch("src.pipeline.nodes.llm.load_categories")
+    async def test_retry_then_success(self, mock_load, mock_client_cls, monkeypatch):
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+        monkeypatch.setenv("LLM_MAX_RETRIES", "1")
+        monkeypatch.setenv("LLM_RETRY_BASE_DELAY", "0")
+        mock_load.return_value = {"invoice": MagicMock(), "contract": MagicMock()}
+
+        mock_client = MagicMock()
+        mock_client.messages.create = AsyncMock(side_effect=[
+            anthropic.APIConnectionError(request=MagicMock()),
+            _make_mock_response('{"category": "invoice", "confidence": 0.75}'),
+        ])
+        mock_client_cls.return_value.__aenter__ = AsyncMock(return_value=mock_client)
+        mock_client_cls.return_value.__aexit__ = AsyncMock(return_value=False)
+
+        result = await llm_fallback_node_async(SAMPLE_STATE)
+
+        assert result["document_category"] == "invoice"
+        assert result["classification_method"] == "llm_fallback"
+        assert mock_client.messages.create.await_count == 2
+        # The per-call client is closed on the way out
+        mock_client_cls.return_value.__aexit__.assert_awaited_once()
+
+    @patch("src.pipeline.nodes.llm.anthropic.AsyncAnthropic")
+    @patch("src.pipeline.nodes.llm.load_categories")
+    async def test_gather_shares_client_and_keeps_order(self, mock_load, mock_client_cls, monkeypatch):
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+        monkeypatch.setenv("LLM_MAX_RETRIES", "0")
+        mock_load.return_value = {"invoice": MagicMock(), "contract": MagicMock()}
+
+        async def _reply(**kwargs):
+            prompt = kwargs["messages"][0]["content"]
+            category = "contract" if "Agreement" in prompt else "invoice"
+            return _make_mock_response(json.dumps({"category": category, "confidence": 0.8}))
+
+        mock_client = MagicMock()
+        mock_client.messages.create = AsyncMock(side_effect=_reply)
+        mock_client.close = AsyncMock()
+        mock_client_cls.return_value = mock_client
+
+        states = [
+            {**SAMPLE_STATE, "parsed_markdown": "Service Agreement between parties"},
+            SAMPLE_STATE,
+            {**SAMPLE_STATE, "parsed_markdown": "Master Agreement"},
+        ]
+        results = await llm_fallback_gather(states, concurrency=2)
+
+        assert [r["document_category"] for r in results] == ["contract", "invoice", "contract"]
+        assert mock_client_cls.call_count == 1
+        mock_client.close.assert_awaited_once()
+
+    async def test_rate_limiter_paces_beyond_burst(self):
+        limiter = llm._RateLimiter(rpm=1200)  # 20/s, burst of 20
+        start = time.monotonic()
+        for _ in range(23):
+            await limiter.acquire()
+        # Three requests past the burst wait ~50ms each
+        assert time.monotonic() - start >= 0.12
+
+    @patch("src.pipeline.nodes.llm._RateLimiter")
+    @patch("src.pipeline.nodes.llm.anthropic.AsyncAnthropic")
+    @patch("src.pipeline.nodes.llm.load_categories")
+    async def test_gather_uses_limiter_when_rpm_set(
+        self, mock_load, mock_client_cls, mock_limiter_cls, monkeypatch,
+    ):
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+        monkeypatch.setenv("LLM_MAX_RETRIES", "0")
+        monkeypatch.setenv("LLM_RPM", "120")
+        mock_load.return_value = {"invoice": MagicMock()}
+        mock_limiter_cls.return_value.acquire = AsyncMock()
+
+        mock_client = MagicMock()
+        mock_client.messages.create = AsyncMock(
+            return_value=_make_mock_response('{"category": "invoice", "confidence": 0.8}'),
+        )
+        mock_client.close = AsyncMock()
+        mock_client_cls.return_value = mock_client
+
+        await llm_fallback_gather([SAMPLE_STATE, SAMPLE_STATE])
+
+        mock_limiter_cls.assert_called_once_with(120)
+        assert mock_limiter_cls.return_value.acquire.await_count == 2
+
+
+# ---------------------------------------------------------------------------
+# Message Batches path
+# ---------------------------------------------------------------------------
+
+
+def _batch_entry(custom_id: str, text: str | None) -> MagicMock:
+    entry = MagicMock()
+    entry.custom_id = custom_id
+    if text is None:
+        entry.result.type = "errored"
+    else:
+        entry.result.type = "succeeded"
+        entry.result.message = _make_mock_response(text)
+    return entry
+
+
+class TestLlmFallbackBatch:
+    """Tests for llm_fallback_batch (Message Batches API)."""
+
+    def test_no_api_key_all_unavailable(self, monkeypatch):
+        monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+        results = llm_fallback_batch([SAMPLE_STATE, SAMPLE_STATE])
+        assert results == [{"llm_unavailable": True}, {"llm_unavailable": True}]
+
+    @patch("src.pipeline.nodes.llm.anthropic.Anthropic")
+    @patch("src.pipeline.nodes.llm.load_categories")
+    def test_results_mapped_back_in_order(self, mock_load, mock_client_cls, monkeypatch):
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+        mock_load.return_value = {"invoice": MagicMock(), "contract": MagicMock()}
+
+        mock_client = MagicMock()
+        mock_client_cls.return_value = mock_client
+        batches = mock_client.messages.batches
+        batches.create.return_value = MagicMock(id="batch-1", processing_status="in_progress")
+        batches.retrieve.return_value = MagicMock(id="batch-1", processing_status="ended")
+        # Results arrive in arbitrary order; one request errored
+        batches.results.return_value = iter([
+            _batch_entry("doc-2", '{"category": "contract", "confidence": 0.7}'),
+            _batch_entry("doc-1", None),
+            _batch_entry("doc-0", '{"category": "invoice", "confidence": 0.9}'),
+        ])
+
+        results = llm_fallback_batch([SAMPLE_STATE] * 3, poll_interval=0)
+
+        assert results[0]["document_category"] == "invoice"
+        assert results[1] == {"llm_unavailable": True}
+        assert results[2]["document_category"] == "contract"
+        requests = batches.create.call_args[1]["requests"]
+        assert [r["custom_id"] for r in requests] == ["doc-0", "doc-1", "doc-2"]
+        batches.retrieve.assert_called_once_with("batch-1")
+
+    @patch("src.pipeline.nodes.llm.sleep")
+    @patch("src.pipeline.nodes.llm.anthropic.Anthropic")
+    @patch("src.pipeline.nodes.llm.load_categories")
+    def test_poll_interval_backs_off(self, mock_load, mock_client_cls, mock_sleep, monkeypatch):
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+        mock_load.return_value = {"invoice": MagicMock()}
+
+        mock_client = MagicMock()
+        mock_client_cls.return_value = mock_client
+        batches = mock_client.messages.batches
+        batches.create.return_value = MagicMock(id="batch-1", processing_status="in_progress")
+        batches.retrieve.side_effect = [
+            MagicMock(id="batch-1", processing_status="in_progress"),
+            MagicMock(id="batch-1", processing_status="in_progress"),
+            MagicMock(id="batch-1", processing_status="ended"),
+        ]
+        batches.results.return_value = iter([])
+
+        llm_fallback_batch([SAMPLE_STATE], poll_interval=200)
+
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [200, 300.0, 300.0]
@@ -10,14 +10,17 @@ Tests for src/metadata/extractor.py covering:
 Run:  PYTHONPATH=. .venv/Scripts/pytest tests/test_metadata.py -v
 """
 
+import io
 import os
 import tempfile
+import zipfile
 from datetime import datetime, timezone
 from pathlib import Path
 
 import pytest
 
-from src.metadata.extractor import extract_metadata
+from src.metadata import extractor
+from src.metadata.extractor import clear_metadata_cache, extract_metadata, sniff_mime
 from src.models.schemas import DocumentMetadata
 
 # ---------------------------------------------------------------------------
@@ -26,27 +29,12 @@ from src.models.schemas import DocumentMetadata
 
 FIXTURES_DIR = Path(__file__).parent / "fixtures" / "documents"
 
+# invoice_bytes / resume_bytes / contract_bytes come from conftest.py
 
-def _load_fixture(name: str) -> bytes:
-    """Read a test fixture as raw bytes."""
-    path = FIXTURES_DIR / name
-    assert path.exists(), f"Fixture not found: {path}"
-    return path.read_bytes()
-
-
-@pytest.fixture
-def invoice_bytes():
-    return _load_fixture("invoice_digital.pdf")
-
-
-@pytest.fixture
-def resume_bytes():
-    return _load_fixture("resume_standard.pdf")
-
-
-@pytest.fixture
-def contract_bytes():
-    return _load_fixture("contract_service.pdf")
+# Under `pytest -n auto --dist loadgroup`, keep Docling-backed tests on one
+# worker so they share a single warm converter instead of loading models
+# in every worker; warm_converter loads those models before the first test
+pytestmark = [pytest.mark.xdist_group("docling"), pytest.mark.usefixtures("warm_converter")]
 
 
 # ---------------------------------------------------------------------------
@@ -141,6 +129,14 @@ class TestFilesystemMetadata:
         assert isinstance(meta.created_at, datetime)
         assert isinstance(meta.modified_at, datetime)
 
+    def test_source_path_parse_matches_bytes(self, invoice_bytes):
+        """Parsing from the file on disk yields the same internal fields as bytes."""
+        fixture_path = str(FIXTURES_DIR / "invoice_digital.pdf")
+        from_path = extract_metadata(invoice_bytes, "invoice_digital.pdf", source_path=fixture_path)
+        from_bytes = extract_metadata(invoice_bytes, "invoice_digital.pdf")
+        assert from_path.page_count == from_bytes.page_count
+        assert from_path.producer == from_bytes.producer
+
     def test_invalid_source_path_graceful(self, invoice_bytes):
         """Non-existent source_path doesn't crash — timestamps remain None."""
         meta = extract_metadata(invoice_bytes, "invoice.pdf", source_path="/no/such/file.pdf")
@@ -159,6 +155,46 @@ class TestFilesystemMetadata:
         assert meta.mime_type == "application/pdf"
 
 
+def _zip_bytes(*names: str) -> bytes:
+    """In-memory ZIP archive with one small entry per name, in order."""
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        for name in names:
+            zf.writestr(name, "x")
+    return buf.getvalue()
+
+
+class TestSniffMime:
+    """Tests for the magic-byte fast path."""
+
+    def test_png_signature(self):
+        assert sniff_mime(b"\x89PNG\r\n\x1a\n" + b"\x00" * 16, ".png") == "image/png"
+
+    def test_zip_container_resolved_by_extension(self):
+        docx = _zip_bytes("[Content_Types].xml", "_rels/.rels", "word/document.xml")
+        assert sniff_mime(docx, ".docx") == (
+            "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+        )
+
+    def test_plain_zip_falls_back_to_filetype(self):
+        assert sniff_mime(_zip_bytes("a.txt"), ".zip") == "application/zip"
+
+    @pytest.mark.parametrize("names", [("a.txt",), ("META-INF/MANIFEST.MF", "App.class")])
+    def test_renamed_archive_not_office(self, names):
+        """A .zip or .jar renamed to .docx carries no OOXML entries."""
+        assert sniff_mime(_zip_bytes(*names), ".docx") == "application/zip"
+
+    def test_jpeg_signature(self):
+        assert sniff_mime(b"\xff\xd8\xff\xe0" + b"\x00" * 16, ".jpg") == "image/jpeg"
+
+    def test_shared_lead_bytes_without_full_prefix(self):
+        """'%P' alone is not a PDF; the full '%PDF-' prefix must match."""
+        assert sniff_mime(b"%PS-Adobe-3.0 plain", ".ps") != "application/pdf"
+
+    def test_unknown_bytes_return_none(self):
+        assert sniff_mime(b"plain text, no signature", ".txt") is None
+
+
 # ---------------------------------------------------------------------------
 # PDF internal metadata tests
 # ---------------------------------------------------------------------------
@@ -197,6 +233,58 @@ class TestPdfMetadata:
         assert meta.file_size_bytes == 9
 
 
+class TestOfficeMetadata:
+    """Tests for DOCX/PPTX core-properties extraction (optional libraries)."""
+
+    def test_docx_core_properties(self):
+        docx = pytest.importorskip("docx")
+        doc = docx.Document()
+        doc.core_properties.author = "Jane Smith"
+        doc.core_properties.title = "Quarterly Report"
+        buf = io.BytesIO()
+        doc.save(buf)
+
+        meta = extract_metadata(buf.getvalue(), "report.docx")
+        assert meta.author == "Jane Smith"
+        assert meta.title == "Quarterly Report"
+
+    def test_pptx_slide_count(self):
+        pptx = pytest.importorskip("pptx")
+        prs = pptx.Presentation()
+        prs.slides.add_slide(prs.slide_layouts[0])
+        prs.slides.add_slide(prs.slide_layouts[0])
+        buf = io.BytesIO()
+        prs.save(buf)
+
+        meta = extract_metadata(buf.getvalue(), "deck.pptx")
+        assert meta.page_count == 2
+
+
+class TestInternalMetadataCache:
+    """Tests for the content-addressed internal-metadata cache."""
+
+    def test_same_bytes_parsed_once(self, invoice_bytes, monkeypatch):
+        clear_metadata_cache()
+        calls = []
+        real = extractor._extract_pdf_metadata
+        monkeypatch.setitem(
+            extractor._EXTRACTORS, ".pdf", lambda src: calls.append(src) or real(src),
+        )
+
+        first = extract_metadata(invoice_bytes, "a.pdf")
+        second = extract_metadata(invoice_bytes, "b.pdf")
+
+        assert len(calls) == 1
+        assert first.page_count == second.page_count
+        clear_metadata_cache()
+
+    def test_source_path_bypasses_cache(self, invoice_bytes):
+        clear_metadata_cache()
+        fixture_path = str(FIXTURES_DIR / "invoice_digital.pdf")
+        extract_metadata(invoice_bytes, "invoice_digital.pdf", source_path=fixture_path)
+        assert not extractor._internal_cache
+
+
 # ---------------------------------------------------------------------------
 # Integration: metadata in parse_node output
 # ---------------------------------------------------------------------------
@@ -221,6 +309,8 @@ class TestParseNodeMetadataIntegration:
         assert meta["mime_type"] == "application/pdf"
         assert meta["page_count"] is not None
         assert meta["page_count"] >= 1
+        # The unvalidated model built by extract_metadata still satisfies the schema
+        assert DocumentMetadata.model_validate(meta).page_count == meta["page_count"]
 
     def test_parse_node_metadata_on_validation_failure(self):
         """Even when file validation fails, no metadata is returned (rejected before extraction)."""
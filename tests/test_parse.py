@@ -7,10 +7,20 @@ and handles edge cases (empty bytes, missing filename).
 Run:  PYTHONPATH=. .venv/Scripts/pytest tests/test_parse.py -v
 """
 
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 from pathlib import Path
+from unittest.mock import MagicMock
+
+from docling.datamodel.base_models import ConversionStatus, InputFormat
 
-from src.pipeline.nodes.parse import parse_node
+import src.pipeline.nodes.parse as parse_mod
+from src.pipeline.nodes.parse import (
+    _ocr_options, _persist_markdown, flush_markdown, parse_batch, parse_node,
+)
 
 # ---------------------------------------------------------------------------
 # Fixtures
@@ -18,27 +28,12 @@ from src.pipeline.nodes.parse import parse_node
 
 FIXTURES_DIR = Path(__file__).parent / "fixtures" / "documents"
 
+# invoice_bytes / resume_bytes / contract_bytes come from conftest.py
 
-def _load_fixture(name: str) -> bytes:
-    """Read a test PDF fixture as raw bytes."""
-    path = FIXTURES_DIR / name
-    assert path.exists(), f"Fixture not found: {path}"
-    return path.read_bytes()
-
-
-@pytest.fixture
-def invoice_bytes():
-    return _load_fixture("invoice_digital.pdf")
-
-
-@pytest.fixture
-def resume_bytes():
-    return _load_fixture("resume_standard.pdf")
-
-
-@pytest.fixture
-def contract_bytes():
-    return _load_fixture("contract_service.pdf")
+# Under `pytest -n auto --dist loadgroup`, keep Docling-backed tests on one
+# worker so they share a single warm converter instead of loading models
+# in every worker; warm_converter loads those models before the first test
+pytestmark = [pytest.mark.xdist_group("docling"), pytest.mark.usefixtures("warm_converter")]
 
 
 # ---------------------------------------------------------------------------
@@ -102,6 +97,32 @@ class TestParseNodeErrors:
         assert "parse_error" in result
         assert "No file bytes" in result["parse_error"]
 
+    def test_source_path_read_when_bytes_absent(self, tmp_path):
+        """Without file_bytes, parse_node reads source_path itself."""
+        path = tmp_path / "notes.user1"
+        path.write_bytes(b"this is just plain text with no magic bytes")
+        result = parse_node({"source_filename": path.name, "source_path": str(path)})
+        # The content was read and reached validation (not the empty-bytes guard)
+        assert "unknown extension" in result["parse_error"]
+
+    def test_unreadable_source_path_returns_error(self, tmp_path):
+        missing = tmp_path / "gone.pdf"
+        result = parse_node({"source_filename": "gone.pdf", "source_path": str(missing)})
+        assert "Could not read" in result["parse_error"]
+
+    def test_empty_source_path_returns_error(self, tmp_path):
+        path = tmp_path / "empty.pdf"
+        path.write_bytes(b"")
+        result = parse_node({"source_filename": "empty.pdf", "source_path": str(path)})
+        assert "No file bytes" in result["parse_error"]
+
+    def test_source_path_metadata_from_mapped_file(self):
+        path = FIXTURES_DIR / "invoice_digital.pdf"
+        result = parse_node({"source_filename": path.name, "source_path": str(path)})
+        meta = result["document_metadata"]
+        assert meta["file_size_bytes"] == path.stat().st_size
+        assert meta["mime_type"] == "application/pdf"
+
     def test_corrupt_bytes_returns_error(self):
         result = parse_node({"file_bytes": b"not a real pdf", "source_filename": "corrupt.pdf"})
         assert "parse_error" in result
@@ -225,3 +246,109 @@ class TestFileValidation:
         })
         assert "parse_error" in result
         assert "dangerous extension" in result["parse_error"]
+
+
+# ---------------------------------------------------------------------------
+# Batch parsing (process pool)
+# ---------------------------------------------------------------------------
+
+
+class TestParseBatch:
+    """parse_batch fans parse_node out to worker processes."""
+
+    def test_empty_batch(self):
+        assert parse_batch([]) == []
+
+    def test_results_in_input_order(self, monkeypatch):
+        monkeypatch.setenv("PARSE_WORKERS", "2")
+        states = [
+            {"file_bytes": b"fake", "source_filename": "a.exe"},
+            {"file_bytes": b"", "source_filename": "b.pdf"},
+            {"file_bytes": b"fake", "source_filename": "c.bat"},
+        ]
+        results = parse_batch(states)
+        assert "'.exe'" in results[0]["parse_error"]
+        assert "No file bytes" in results[1]["parse_error"]
+        assert "'.bat'" in results[2]["parse_error"]
+
+
+class TestConcurrentParse:
+    """Threads sharing the module converter never call convert() at once."""
+
+    def test_convert_calls_serialised(self, invoice_bytes, monkeypatch):
+        active = 0
+        peak = 0
+        guard = threading.Lock()
+
+        def _convert(source, raises_on_error=False):
+            nonlocal active, peak
+            with guard:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.02)
+            with guard:
+                active -= 1
+            result = MagicMock(status=ConversionStatus.SUCCESS, errors=[])
+            result.document.export_to_markdown.return_value = "# Invoice"
+            return result
+
+        fake = MagicMock()
+        fake.convert.side_effect = _convert
+        monkeypatch.setattr(parse_mod, "_converter", fake)
+
+        state = {"file_bytes": invoice_bytes, "source_filename": "invoice_digital.pdf"}
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(parse_node, [state] * 4))
+
+        assert all(r["parsed_markdown"] == "# Invoice" for r in results)
+        assert fake.convert.call_count == 4
+        assert peak == 1
+
+
+class TestOcrOptions:
+    """RapidOCR model paths can be overridden from the environment."""
+
+    def test_defaults_without_env(self, monkeypatch):
+        for var in ("RAPIDOCR_DET_MODEL", "RAPIDOCR_REC_MODEL", "RAPIDOCR_CLS_MODEL"):
+            monkeypatch.delenv(var, raising=False)
+        opts = _ocr_options()
+        assert opts.det_model_path is None
+        assert opts.rec_model_path is None
+
+    def test_env_model_paths_applied(self, monkeypatch):
+        monkeypatch.setenv("RAPIDOCR_DET_MODEL", "/models/det.int8.onnx")
+        monkeypatch.setenv("RAPIDOCR_REC_MODEL", "")
+        opts = _ocr_options()
+        assert opts.det_model_path == "/models/det.int8.onnx"
+        assert opts.rec_model_path is None
+
+
+class TestParseTimeout:
+    """PARSE_TIMEOUT_S caps Docling's per-document processing time."""
+
+    def test_timeout_applied_to_pipeline_options(self, monkeypatch):
+        monkeypatch.setattr(parse_mod, "_converter", None)
+        monkeypatch.setenv("PARSE_TIMEOUT_S", "45")
+        converter = parse_mod._get_converter()
+        options = converter.format_to_options[InputFormat.PDF].pipeline_options
+        assert options.document_timeout == 45.0
+
+
+class TestWarmUp:
+    """warm_up() initialises the PDF pipeline on the shared converter."""
+
+    def test_initialises_pdf_pipeline(self, monkeypatch):
+        fake = MagicMock()
+        monkeypatch.setattr(parse_mod, "_converter", fake)
+        parse_mod.warm_up()
+        fake.initialize_pipeline.assert_called_once_with(InputFormat.PDF)
+
+
+class TestPersistMarkdown:
+    """Debug Markdown is written by a background thread."""
+
+    def test_queued_markdown_written_after_flush(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        _persist_markdown("doc-1", "# Title")
+        flush_markdown()
+        assert (tmp_path / "data" / "output" / "doc-1.md").read_text(encoding="utf-8") == "# Title"
@@ -14,8 +14,16 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from src.pipeline.graph import build_graph, route_after_classify, run_pipeline
+from src.pipeline.graph import (
+    _compile_graph,
+    arun_pipeline,
+    build_graph,
+    route_after_classify,
+    run_pipeline,
+    run_pipeline_batch,
+)
 from src.pipeline.nodes.classify import classify_node
+from src.pipeline.nodes.llm import llm_fallback_node
 from src.pipeline.nodes.output import output_node
 from src.pipeline.nodes.validate import validate_node
 from src.pipeline.nodes.audit import audit_node
@@ -88,6 +96,16 @@ class TestGraphStructure:
         # LangGraph adds __start__ and __end__ nodes
         assert expected.issubset(node_names)
 
+    def test_build_graph_reuses_compiled_graph(self):
+        assert build_graph() is build_graph()
+
+    def test_patched_node_gets_fresh_graph(self):
+        """Patching a node at module level must not hit the cached graph."""
+        real = build_graph()
+        with patch("src.pipeline.graph.parse_node"):
+            assert build_graph() is not real
+        assert build_graph() is real
+
 
 # ---------------------------------------------------------------------------
 # Routing Logic Tests
@@ -115,17 +133,26 @@ class TestRouting:
 # ---------------------------------------------------------------------------
 
 
+@pytest.fixture(scope="module")
+def classified_invoice():
+    """classify_node output for INVOICE_MARKDOWN (deterministic, so shared)."""
+    return classify_node({"parsed_markdown": INVOICE_MARKDOWN})
+
+
 class TestClassifyNode:
     """Tests for the classify_node function."""
 
-    def test_deterministic_invoice(self):
-        state = {"parsed_markdown": INVOICE_MARKDOWN}
-        result = classify_node(state)
+    def test_deterministic_invoice(self, classified_invoice):
+        result = classified_invoice
         assert result["document_category"] == "invoice"
         assert result["classification_method"] == "deterministic"
         assert result["classification_confidence"] >= 0.60
         assert len(result["matched_keywords"]) > 0
 
+    def test_confidence_rounded_to_4dp(self, classified_invoice):
+        confidence = classified_invoice["classification_confidence"]
+        assert confidence == round(confidence, 4)
+
     def test_unclassified_sets_escalation(self):
         state = {"parsed_markdown": GARBAGE_MARKDOWN}
         result = classify_node(state)
@@ -133,9 +160,8 @@ class TestClassifyNode:
         assert result["classification_method"] == "unclassified"
         assert result.get("llm_escalation_reason") is not None
 
-    def test_extracts_fields_for_invoice(self):
-        state = {"parsed_markdown": INVOICE_MARKDOWN}
-        result = classify_node(state)
+    def test_extracts_fields_for_invoice(self, classified_invoice):
+        result = classified_invoice
         assert result["document_category"] == "invoice"
         fields = result.get("extracted_fields", {})
         # The invoice YAML has regex patterns for common fields
@@ -238,7 +264,7 @@ class TestOutputNode:
             "extracted_fields": {"invoice_number": "INV-001"},
             "validation_status": "valid",
             "validation_errors": [],
-            "start_time_ms": int(time.time() * 1000) - 100,
+            "start_time_ms": time.monotonic_ns() // 1_000_000 - 100,
         }
         result = output_node(state)
         assert result["final_output"] is not None
@@ -247,14 +273,20 @@ class TestOutputNode:
         assert result["processing_duration_ms"] >= 0
 
     def test_calculates_duration(self):
-        state = {"start_time_ms": int(time.time() * 1000) - 500}
+        state = {"start_time_ms": time.monotonic_ns() // 1_000_000 - 500}
         result = output_node(state)
-        assert result["processing_duration_ms"] >= 0
+        assert result["processing_duration_ms"] >= 500
+
+    def test_wall_clock_start_time_converted(self, caplog):
+        state = {"start_time_ms": time.time_ns() // 1_000_000 - 500}
+        result = output_node(state)
+        assert 500 <= result["processing_duration_ms"] < 60_000
+        assert "wall-clock" in caplog.text
 
     def test_pipeline_error_returns_none(self):
         state = {
             "pipeline_error": "Parse failed",
-            "start_time_ms": int(time.time() * 1000),
+            "start_time_ms": time.monotonic_ns() // 1_000_000,
         }
         result = output_node(state)
         assert result["final_output"] is None
@@ -266,23 +298,58 @@ class TestOutputNode:
 # ---------------------------------------------------------------------------
 
 
+@pytest.fixture(scope="module")
+def stub_parse_graph():
+    """
+    Graph compiled once per module whose parse step delegates to a mock.
+
+    LangGraph captures node callables at compile time, so instead of
+    patching parse_node and recompiling per test, the graph holds a thin
+    wrapper around one MagicMock that each test configures.
+    """
+    parse = MagicMock()
+
+    def _parse(state):
+        return parse(state)
+
+    graph = _compile_graph(
+        _parse, classify_node, llm_fallback_node, validate_node, audit_node, output_node,
+    )
+    return graph, parse
+
+
+@pytest.fixture
+def mock_parse(stub_parse_graph):
+    _, parse = stub_parse_graph
+    parse.reset_mock(return_value=True, side_effect=True)
+    return parse
+
+
+@pytest.fixture
+def graph(stub_parse_graph):
+    return stub_parse_graph[0]
+
+
 class TestFullPipeline:
-    """End-to-end pipeline tests with mocked Docling parse node.
+    """End-to-end pipeline tests with a mocked Docling parse node.
 
-    We patch parse_node at the graph module level because LangGraph captures
-    the function reference at build_graph() time. We rebuild the graph
-    inside each test so the mock is picked up.
+    All tests share the module's stub_parse_graph; mock_parse configures
+    what its parse step returns.
     """
 
-    @patch("src.pipeline.graph.parse_node")
-    def test_deterministic_invoice_flow(self, mock_parse):
+    @pytest.fixture(autouse=True)
+    def _audit_to_tmp(self, tmp_path, monkeypatch):
+        """Keep audit entries out of the real AUDIT_LOG_PATH."""
+        monkeypatch.setenv("AUDIT_LOG_PATH", str(tmp_path / "audit.jsonl"))
+
+    def test_deterministic_invoice_flow(self, graph, mock_parse):
         """High-confidence invoice → deterministic path, no LLM call."""
         mock_parse.return_value = {
             "parsed_markdown": INVOICE_MARKDOWN,
             "document_metadata": {"file_size_bytes": 1024},
         }
 
-        result = run_pipeline("invoice.pdf", b"fake-pdf-bytes", document_id="test-det-001")
+        result = run_pipeline("invoice.pdf", b"fake-pdf-bytes", document_id="test-det-001", graph=graph)
 
         assert result["document_category"] == "invoice"
         assert result["classification_method"] == "deterministic"
@@ -292,8 +359,7 @@ class TestFullPipeline:
         assert result["final_output"]["document_category"] == "invoice"
         assert result["audit_id"] is not None
 
-    @patch("src.pipeline.graph.parse_node")
-    def test_unclassified_routes_to_llm(self, mock_parse, monkeypatch):
+    def test_unclassified_routes_to_llm(self, graph, mock_parse, monkeypatch):
         """Garbage text → low confidence → routes to LLM → LLM unavailable."""
         mock_parse.return_value = {
             "parsed_markdown": GARBAGE_MARKDOWN,
@@ -302,15 +368,14 @@ class TestFullPipeline:
         # No API key → LLM returns unavailable
         monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
 
-        result = run_pipeline("unknown.pdf", b"fake-bytes", document_id="test-unk-001")
+        result = run_pipeline("unknown.pdf", b"fake-bytes", document_id="test-unk-001", graph=graph)
 
         assert result.get("llm_escalation_reason") is not None
         assert result.get("llm_unavailable") is True
         assert result["final_output"] is not None
         assert result["audit_id"] is not None
 
-    @patch("src.pipeline.graph.parse_node")
-    def test_parse_error_propagates(self, mock_parse):
+    def test_parse_error_propagates(self, graph, mock_parse):
         """Parse failure → pipeline_error propagates through all nodes."""
         mock_parse.return_value = {
             "parse_error": "Blocked file extension: .exe",
@@ -318,20 +383,56 @@ class TestFullPipeline:
             "document_metadata": {},
         }
 
-        result = run_pipeline("malware.exe", b"MZ\x90\x00", document_id="test-err-001")
+        result = run_pipeline("malware.exe", b"MZ\x90\x00", document_id="test-err-001", graph=graph)
 
         assert result.get("pipeline_error") is not None
         assert result["final_output"] is None
         assert result["audit_id"] is not None  # Every doc gets an audit entry
 
-    @patch("src.pipeline.graph.parse_node")
-    def test_pipeline_returns_processing_duration(self, mock_parse):
+    def test_pipeline_returns_processing_duration(self, graph, mock_parse):
         """Pipeline always calculates processing duration."""
         mock_parse.return_value = {
             "parsed_markdown": INVOICE_MARKDOWN,
             "document_metadata": {},
         }
 
-        result = run_pipeline("test.pdf", b"fake", document_id="test-dur-001")
+        result = run_pipeline("test.pdf", b"fake", document_id="test-dur-001", graph=graph)
 
         assert result["processing_duration_ms"] >= 0
+
+    def test_batch_preserves_order(self, graph, mock_parse, monkeypatch):
+        """run_pipeline_batch returns one state per item, in input order."""
+        monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+        mock_parse.return_value = {
+            "parsed_markdown": INVOICE_MARKDOWN,
+            "document_metadata": {},
+        }
+
+        items = [(f"doc{i}.pdf", b"fake", f"batch-{i:03d}") for i in range(6)]
+        results = run_pipeline_batch(items, max_workers=3, graph=graph)
+
+        assert [r["document_id"] for r in results] == [i[2] for i in items]
+        assert all(r["document_category"] == "invoice" for r in results)
+
+    async def test_arun_pipeline_gathers_scenarios(self, graph, mock_parse, monkeypatch):
+        """Concurrent async runs each follow their own route."""
+        import asyncio
+        monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+        markdown = {"invoice.pdf": INVOICE_MARKDOWN, "unknown.pdf": GARBAGE_MARKDOWN}
+        mock_parse.side_effect = lambda state: {
+            "parsed_markdown": markdown[state["source_filename"]],
+            "document_metadata": {},
+        }
+
+        invoice, unknown = await asyncio.gather(
+            arun_pipeline("invoice.pdf", b"fake", document_id="async-det", graph=graph),
+            arun_pipeline("unknown.pdf", b"fake", document_id="async-unk", graph=graph),
+        )
+
+        assert invoice["classification_method"] == "deterministic"
+        assert invoice["final_output"]["document_category"] == "invoice"
+        assert unknown.get("llm_unavailable") is True
+        assert {invoice["document_id"], unknown["document_id"]} == {"async-det", "async-unk"}
+
+    def test_batch_empty(self):
+        assert run_pipeline_batch([]) == []
@@ -11,30 +11,73 @@ Tests for src/watcher.py covering:
 Run:  PYTHONPATH=. .venv/Scripts/pytest tests/test_watcher.py -v
 """
 
+import asyncio
 import os
 import tempfile
+import threading
 import time
 from pathlib import Path
-from unittest.mock import MagicMock
 
 import pytest
+from watchdog.events import FileCreatedEvent, FileModifiedEvent, FileMovedEvent
+from watchdog.observers import Observer
 
-from src.watcher import DirectoryWatcher, WATCHED_EXTENSIONS
+from src.watcher import (
+    AsyncDirectoryWatcher,
+    DirectoryWatcher,
+    WATCHED_EXTENSIONS,
+    _DocumentHandler,
+    _watch_handlers,
+)
 
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
-def _wait_for_call(mock: MagicMock, timeout: float = 3.0, interval: float = 0.1) -> bool:
-    """Poll until mock is called or timeout is reached."""
-    elapsed = 0.0
-    while elapsed < timeout:
-        if mock.call_count > 0:
-            return True
-        time.sleep(interval)
-        elapsed += interval
-    return False
+class Recorder:
+    """
+    Minimal watcher callback: records each reported path and releases a
+    semaphore per call, so tests block until it fires instead of polling.
+    Cheaper than a MagicMock; watcher tests only need the paths.
+    """
+
+    __slots__ = ("paths", "_arrived")
+
+    def __init__(self) -> None:
+        self.paths: list[str] = []
+        self._arrived = threading.Semaphore(0)
+
+    def __call__(self, path: str) -> None:
+        self.paths.append(path)
+        self._arrived.release()
+
+    @property
+    def n(self) -> int:
+        return len(self.paths)
+
+    @property
+    def last(self) -> str:
+        return self.paths[-1]
+
+    def wait(self, n: int = 1, timeout: float = 3.0) -> bool:
+        """Wait until `n` more calls have arrived, or the timeout runs out."""
+        deadline = time.monotonic() + timeout
+        for _ in range(n):
+            if not self._arrived.acquire(timeout=max(0.0, deadline - time.monotonic())):
+                return False
+        return True
+
+
+def _assert_ignored(tmp_path: Path, callback: Recorder) -> None:
+    """
+    Prove nothing was reported for files written so far: events arrive in
+    order, so once a sentinel .pdf written afterwards is reported, the only
+    callback must be the sentinel's.
+    """
+    (tmp_path / "zz_sentinel.pdf").write_bytes(b"%PDF sentinel")
+    assert callback.wait(), "Sentinel file was not reported"
+    assert callback.paths == [str(tmp_path / "zz_sentinel.pdf")]
 
 
 # ---------------------------------------------------------------------------
@@ -77,6 +120,40 @@ class TestWatcherLifecycle:
         watcher = DirectoryWatcher(str(tmp_path), callback=lambda p: None)
         watcher.stop()  # Should not raise
 
+    def test_restart_reuses_kept_observer(self, tmp_path):
+        """stop(keep_observer=True) keeps the thread; start() schedules on it again."""
+        callback = Recorder()
+        watcher = DirectoryWatcher(str(tmp_path), callback=callback)
+        watcher.start()
+        observer = watcher._observer
+        watcher.stop(keep_observer=True)
+        assert not watcher.is_running
+        assert observer.is_alive()
+        watcher.start()
+        try:
+            assert watcher._observer is observer
+            (tmp_path / "again.pdf").write_bytes(b"%PDF again")
+            assert callback.wait()
+        finally:
+            watcher.stop()
+        assert not observer.is_alive()
+
+    def test_stop_stops_observer_thread(self, tmp_path):
+        watcher = DirectoryWatcher(str(tmp_path), callback=lambda p: None)
+        watcher.start()
+        observer = watcher._observer
+        watcher.stop()
+        assert not observer.is_alive()
+        assert not watcher.is_running
+
+    def test_start_stop_cycles_leak_no_threads(self, tmp_path):
+        watcher = DirectoryWatcher(str(tmp_path), callback=lambda p: None)
+        before = threading.active_count()
+        for _ in range(5):
+            watcher.start()
+            watcher.stop()
+        assert threading.active_count() == before
+
     def test_watch_dir_property(self, tmp_path):
         watcher = DirectoryWatcher(str(tmp_path), callback=lambda p: None)
         assert watcher.watch_dir == str(tmp_path)
@@ -87,114 +164,271 @@ class TestWatcherLifecycle:
 # ---------------------------------------------------------------------------
 
 
+@pytest.fixture(scope="class")
+def shared_watcher(tmp_path_factory):
+    """
+    One recursive watcher for a whole test class. Yields (root, route):
+    route[0] is the callback of the test currently running.
+    """
+    root = tmp_path_factory.mktemp("watch")
+    route = [lambda _path: None]
+    watcher = DirectoryWatcher(str(root), callback=lambda path: route[0](path), recursive=True)
+    watcher.start()
+    yield root, route
+    watcher.stop()
+
+
+@pytest.fixture
+def watched(shared_watcher, request):
+    """Fresh subdirectory of the shared watch root, plus a fresh callback."""
+    root, route = shared_watcher
+    subdir = root / request.node.name
+    subdir.mkdir()
+    callback = Recorder()
+    route[0] = callback
+    yield subdir, callback
+    route[0] = lambda _path: None
+
+
 class TestFileDetection:
-    """Tests for callback invocation on new file creation."""
+    """Tests for callback invocation on new file creation (one shared watcher)."""
+
+    def test_pdf_triggers_callback(self, watched):
+        subdir, callback = watched
+        test_file = subdir / "test.pdf"
+        test_file.write_bytes(b"%PDF-1.4 test content")
+        assert callback.wait(), "Callback was not invoked for .pdf"
+        assert callback.n == 1
+        called_path = callback.last
+        assert called_path.endswith("test.pdf")
+
+    def test_docx_triggers_callback(self, watched):
+        subdir, callback = watched
+        test_file = subdir / "doc.docx"
+        test_file.write_bytes(b"PK fake docx")
+        assert callback.wait(), "Callback was not invoked for .docx"
+        assert callback.n == 1
+
+    def test_unsupported_extension_ignored(self, watched):
+        subdir, callback = watched
+        test_file = subdir / "readme.txt"
+        test_file.write_text("hello")
+        _assert_ignored(subdir, callback)
+
+    def test_exe_ignored(self, watched):
+        subdir, callback = watched
+        test_file = subdir / "malware.exe"
+        test_file.write_bytes(b"MZ\x90\x00")
+        _assert_ignored(subdir, callback)
+
+    def test_multiple_files_trigger_multiple_callbacks(self, watched):
+        subdir, callback = watched
+        for i in range(3):
+            (subdir / f"doc_{i}.pdf").write_bytes(b"%PDF test")
+        assert callback.wait(n=3, timeout=5.0)
+        assert callback.n >= 3
 
-    def test_pdf_triggers_callback(self, tmp_path):
-        callback = MagicMock()
-        watcher = DirectoryWatcher(str(tmp_path), callback=callback)
-        watcher.start()
-        try:
-            # Give observer time to start
-            time.sleep(0.3)
-            test_file = tmp_path / "test.pdf"
-            test_file.write_bytes(b"%PDF-1.4 test content")
-            assert _wait_for_call(callback), "Callback was not invoked for .pdf"
-            callback.assert_called_once()
-            called_path = callback.call_args[0][0]
-            assert called_path.endswith("test.pdf")
-        finally:
-            watcher.stop()
 
-    def test_docx_triggers_callback(self, tmp_path):
-        callback = MagicMock()
+# ---------------------------------------------------------------------------
+# Extension coverage tests
+# ---------------------------------------------------------------------------
+
+
+class TestWatchedExtensions:
+    """Verify all WATCHED_EXTENSIONS are the expected set."""
+
+    def test_expected_extensions(self):
+        expected = {".pdf", ".docx", ".pptx", ".png", ".jpg", ".jpeg", ".tiff", ".tif"}
+        assert WATCHED_EXTENSIONS == expected
+
+    def test_each_supported_extension_triggers(self, tmp_path):
+        """Each extension in WATCHED_EXTENSIONS should trigger the callback."""
+        # One watcher for all extensions: observer start-up is paid once and
+        # the files settle through the coalescing window together
+        callback = Recorder()
         watcher = DirectoryWatcher(str(tmp_path), callback=callback)
         watcher.start()
         try:
-            time.sleep(0.3)
-            test_file = tmp_path / "doc.docx"
-            test_file.write_bytes(b"PK fake docx")
-            assert _wait_for_call(callback), "Callback was not invoked for .docx"
-            callback.assert_called_once()
+            for ext in sorted(WATCHED_EXTENSIONS):
+                (tmp_path / f"test_file{ext}").write_bytes(b"test content bytes")
+            callback.wait(n=len(WATCHED_EXTENSIONS), timeout=5.0)
+            reported = {Path(p).suffix for p in callback.paths}
+            missing = WATCHED_EXTENSIONS - reported
+            assert not missing, f"Callback not invoked for extensions {sorted(missing)}"
         finally:
             watcher.stop()
 
-    def test_unsupported_extension_ignored(self, tmp_path):
-        callback = MagicMock()
-        watcher = DirectoryWatcher(str(tmp_path), callback=callback)
-        watcher.start()
+
+class TestEventFiltering:
+    """The handler filters events without touching the filesystem."""
+
+    def test_only_created_and_moved_dispatched(self):
+        callback = Recorder()
+        handler = _DocumentHandler(callback)
+        handler.dispatch(FileModifiedEvent("/in/a.pdf"))
+        assert callback.n == 0
+        handler.dispatch(FileCreatedEvent("/in/a.pdf"))
+        handler.dispatch(FileMovedEvent("/in/b.tmp", "/in/b.PDF"))
+        assert callback.paths == ["/in/a.pdf", "/in/b.PDF"]
+
+    @pytest.mark.parametrize("path", ["/in/report.pdf.txt", "/in.pdf/readme", "/in/noext", "C:\\in.pdf\\x"])
+    def test_non_document_paths_ignored(self, path):
+        callback = Recorder()
+        _DocumentHandler(callback)._handle(path)
+        assert callback.n == 0
+
+
+class TestCoalescing:
+    """With latency, repeated events for one file fire a single callback."""
+
+    def test_duplicate_events_fire_once(self, tmp_path):
+        path = tmp_path / "scan.pdf"
+        path.write_bytes(b"%PDF complete")
+        callback = Recorder()
+        handler = _DocumentHandler(callback, latency=0.05)
         try:
+            for _ in range(5):
+                handler._handle(str(path))
+            assert callback.wait(timeout=2.0)
             time.sleep(0.3)
-            test_file = tmp_path / "readme.txt"
-            test_file.write_text("hello")
-            time.sleep(1.0)
-            callback.assert_not_called()
+            assert callback.paths == [str(path)]
         finally:
-            watcher.stop()
+            handler.close()
 
-    def test_exe_ignored(self, tmp_path):
-        callback = MagicMock()
-        watcher = DirectoryWatcher(str(tmp_path), callback=callback)
-        watcher.start()
+    def test_growing_file_waits_until_stable(self, tmp_path):
+        path = tmp_path / "big.pdf"
+        path.write_bytes(b"%PDF")
+        callback = Recorder()
+        handler = _DocumentHandler(callback, latency=0.1)
         try:
-            time.sleep(0.3)
-            test_file = tmp_path / "malware.exe"
-            test_file.write_bytes(b"MZ\x90\x00")
-            time.sleep(1.0)
-            callback.assert_not_called()
+            handler._handle(str(path))
+            for _ in range(20):
+                time.sleep(0.02)
+                with open(path, "ab") as f:
+                    f.write(b"x" * 100)
+            assert callback.n == 0
+            assert callback.wait(timeout=2.0)
         finally:
-            watcher.stop()
+            handler.close()
 
-    def test_multiple_files_trigger_multiple_callbacks(self, tmp_path):
-        callback = MagicMock()
-        watcher = DirectoryWatcher(str(tmp_path), callback=callback)
-        watcher.start()
+    def test_vanished_file_dropped(self, tmp_path):
+        callback = Recorder()
+        handler = _DocumentHandler(callback, latency=0.05)
         try:
-            time.sleep(0.3)
-            for i in range(3):
-                (tmp_path / f"doc_{i}.pdf").write_bytes(b"%PDF test")
-                time.sleep(0.3)
-            # Wait for all callbacks
-            elapsed = 0.0
-            while elapsed < 5.0:
-                if callback.call_count >= 3:
-                    break
-                time.sleep(0.2)
-                elapsed += 0.2
-            assert callback.call_count >= 3
+            handler._handle(str(tmp_path / "gone.pdf"))
+            time.sleep(0.4)
+            assert callback.n == 0
         finally:
-            watcher.stop()
+            handler.close()
 
 
-# ---------------------------------------------------------------------------
-# Extension coverage tests
-# ---------------------------------------------------------------------------
+class TestSharedObserver:
+    """Several watchers can share one observer thread."""
 
+    def test_two_directories_one_observer(self, tmp_path):
+        observer = Observer()
+        observer.daemon = True
+        cb_a, cb_b = Recorder(), Recorder()
+        dir_a, dir_b = tmp_path / "a", tmp_path / "b"
+        watcher_a = DirectoryWatcher(str(dir_a), callback=cb_a, observer=observer)
+        watcher_b = DirectoryWatcher(str(dir_b), callback=cb_b, observer=observer)
+        watcher_a.start()
+        watcher_b.start()
+        try:
+            (dir_a / "one.pdf").write_bytes(b"%PDF a")
+            (dir_b / "two.pdf").write_bytes(b"%PDF b")
+            assert cb_a.wait() and cb_b.wait()
+            assert cb_a.last.endswith("one.pdf")
+            assert cb_b.last.endswith("two.pdf")
+
+            watcher_a.stop()
+            assert not watcher_a.is_running
+            assert watcher_b.is_running  # shared observer keeps running
+        finally:
+            watcher_b.stop()
+            observer.stop()
+            observer.join()
+
+    def test_two_watchers_same_directory(self, tmp_path):
+        """Stopping one watcher leaves the other on the same directory working."""
+        observer = Observer()
+        observer.daemon = True
+        cb_a, cb_b = Recorder(), Recorder()
+        watcher_a = DirectoryWatcher(str(tmp_path), callback=cb_a, observer=observer)
+        watcher_b = DirectoryWatcher(str(tmp_path), callback=cb_b, observer=observer)
+        watcher_a.start()
+        watcher_b.start()
+        try:
+            watcher_a.stop()
+            assert watcher_b.is_running
+            (tmp_path / "after.pdf").write_bytes(b"%PDF after")
+            assert cb_b.wait(), "Remaining watcher lost its events"
+            assert cb_a.n == 0
+        finally:
+            watcher_b.stop()
+            observer.stop()
+            observer.join()
+
+    def test_last_watcher_unschedules_shared_watch(self, tmp_path):
+        observer = Observer()
+        observer.daemon = True
+        watcher_a = DirectoryWatcher(str(tmp_path), callback=Recorder(), observer=observer)
+        watcher_b = DirectoryWatcher(str(tmp_path), callback=Recorder(), observer=observer)
+        watcher_a.start()
+        watcher_b.start()
+        try:
+            assert len(observer.emitters) == 1
+            watcher_a.stop()
+            assert len(observer.emitters) == 1
+            watcher_b.stop()
+            assert not observer.emitters
+            assert not any(key[0] is observer for key in _watch_handlers)
+        finally:
+            observer.stop()
+            observer.join()
+
+    def test_dead_shared_observer_is_replaced(self, tmp_path):
+        """A stopped shared observer is swapped for one new thread, not restarted."""
+        observer = Observer()
+        observer.daemon = True
+        observer.start()
+        observer.stop()
+        observer.join()
+
+        cb_a, cb_b = Recorder(), Recorder()
+        dir_a, dir_b = tmp_path / "a", tmp_path / "b"
+        watcher_a = DirectoryWatcher(str(dir_a), callback=cb_a, observer=observer)
+        watcher_b = DirectoryWatcher(str(dir_b), callback=cb_b, observer=observer)
+        watcher_a.start()
+        watcher_b.start()
+        replacement = watcher_a._observer
+        try:
+            assert replacement is not observer
+            assert watcher_b._observer is replacement
+            assert watcher_a.is_running and watcher_b.is_running
+            (dir_a / "one.pdf").write_bytes(b"%PDF a")
+            (dir_b / "two.pdf").write_bytes(b"%PDF b")
+            assert cb_a.wait() and cb_b.wait()
+        finally:
+            watcher_a.stop()
+            watcher_b.stop()
+            replacement.stop()
+            replacement.join()
 
-class TestWatchedExtensions:
-    """Verify all WATCHED_EXTENSIONS are the expected set."""
 
-    def test_expected_extensions(self):
-        expected = {".pdf", ".docx", ".pptx", ".png", ".jpg", ".jpeg", ".tiff", ".tif"}
-        assert WATCHED_EXTENSIONS == expected
+class TestAsyncWatcher:
+    """AsyncDirectoryWatcher yields detected paths on the event loop."""
 
-    def test_each_supported_extension_triggers(self, tmp_path):
-        """Each extension in WATCHED_EXTENSIONS should trigger the callback."""
-        for ext in WATCHED_EXTENSIONS:
-            callback = MagicMock()
-            watcher = DirectoryWatcher(str(tmp_path), callback=callback)
-            watcher.start()
-            try:
-                time.sleep(0.3)
-                test_file = tmp_path / f"test_file{ext}"
-                test_file.write_bytes(b"test content bytes")
-                triggered = _wait_for_call(callback, timeout=3.0)
-                assert triggered, f"Callback not invoked for extension {ext}"
-            finally:
-                watcher.stop()
-            # Clean up for next iteration
-            if test_file.exists():
-                test_file.unlink()
+    async def test_stream_yields_new_file(self, tmp_path):
+        watcher = AsyncDirectoryWatcher(str(tmp_path))
+        watcher.start()
+        try:
+            (tmp_path / "async.pdf").write_bytes(b"%PDF async")
+            stream = watcher.stream()
+            path = await asyncio.wait_for(stream.__anext__(), timeout=3.0)
+            assert path.endswith("async.pdf")
+        finally:
+            watcher.stop()
 
 
 # ---------------------------------------------------------------------------
@@ -207,24 +441,23 @@ class TestCallbackErrorHandling:
 
     def test_callback_exception_does_not_crash_watcher(self, tmp_path):
         """If the callback raises, the watcher keeps running."""
-        call_count = {"n": 0}
+        calls = Recorder()
 
         def failing_callback(path: str) -> None:
-            call_count["n"] += 1
-            if call_count["n"] == 1:
+            calls(path)
+            if calls.n == 1:
                 raise ValueError("Simulated error")
 
         watcher = DirectoryWatcher(str(tmp_path), callback=failing_callback)
         watcher.start()
         try:
-            time.sleep(0.3)
             # First file triggers exception
             (tmp_path / "file1.pdf").write_bytes(b"%PDF first")
-            time.sleep(1.0)
+            assert calls.wait()
             # Second file should still be picked up
             (tmp_path / "file2.pdf").write_bytes(b"%PDF second")
-            time.sleep(1.0)
-            assert call_count["n"] >= 2, "Watcher stopped after callback exception"
+            assert calls.wait()
+            assert calls.n >= 2, "Watcher stopped after callback exception"
             assert watcher.is_running
         finally:
             watcher.stop()